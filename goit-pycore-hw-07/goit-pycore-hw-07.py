@@ -1,5 +1,6 @@
 from collections import UserDict
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import calendar
 import re
 
 
@@ -41,6 +42,45 @@ def input_error(func):
     return inner
 
 
+# --- Календарний індекс днів народження ---
+LEAP_YEAR = 2000
+
+
+def calendar_day(day) -> int:
+    return date(LEAP_YEAR, day.month, day.day).timetuple().tm_yday - 1
+
+
+FEB_29 = calendar_day(date(LEAP_YEAR, 2, 29))
+
+
+class BirthdayIndex:
+    def __init__(self):
+        self.buckets = [set() for _ in range(366)]
+        self.days = {}
+
+    def add(self, name, birthday):
+        self.remove(name)
+        if birthday is None:
+            return
+        day = calendar_day(birthday)
+        self.buckets[day].add(name)
+        self.days[name] = day
+
+    def remove(self, name):
+        day = self.days.pop(name, None)
+        if day is not None:
+            self.buckets[day].discard(name)
+
+    def upcoming(self, today, days):
+        for offset in range(min(days, 365) + 1):
+            day = today + timedelta(days=offset)
+            names = self.buckets[calendar_day(day)]
+            if day.month == 2 and day.day == 28 and not calendar.isleap(day.year):
+                names = names | self.buckets[FEB_29]
+            for name in sorted(names):
+                yield name, day
+
+
 # --- Класи Адресної книги ---
 class Field:
     def __init__(self, value):
@@ -94,6 +134,8 @@ class Birthday(Field):
 
 
 class Record:
+    book = None
+
     def __init__(self, name: str):
         self.name = Name(name)
         self.phones = []
@@ -102,6 +144,8 @@ class Record:
     def add_birthday(self, birthday: str):
         try:
             self.birthday = Birthday(birthday)
+            if self.book is not None:
+                self.book.birthdays.add(self.name.value, self.birthday.value)
             return f"День народження {birthday} додано для контакту {self.name.value}."
         except DateValidationError as e:
             return str(e)
@@ -150,8 +194,15 @@ class Record:
 
 
 class AddressBook(UserDict):
+    def __init__(self):
+        super().__init__()
+        self.birthdays = BirthdayIndex()
+
     def add_record(self, record: Record):
+        record.book = self
         self.data[record.name.value] = record
+        if record.birthday is not None:
+            self.birthdays.add(record.name.value, record.birthday.value)
         return f"Запис для контакту {record.name.value} додано."
 
     def find(self, name: str) -> Record | None:
@@ -159,35 +210,30 @@ class AddressBook(UserDict):
 
     def delete(self, name: str):
         if name in self.data:
-            del self.data[name]
+            self.data.pop(name).book = None
+            self.birthdays.remove(name)
             return f"Запис для контакту {name} видалено."
         else:
             raise RecordNotFoundError(f"Запис з ім'ям {name} не знайдено.")
 
-    def get_upcoming_birthdays(self):
+    def get_upcoming_birthdays(self, days=7):
         upcoming_birthdays = []
+        seen = set()
         today = datetime.now().date()
-        next_week = today + timedelta(days=7)
 
-        for record in self.data.values():
-            if record.birthday is None:
+        for name, bday_this_year in self.birthdays.upcoming(today, days):
+            if name in seen:
                 continue
+            seen.add(name)
 
-            bday_date = record.birthday.value
-            bday_this_year = bday_date.replace(year=today.year)
-
-            if bday_this_year < today:
-                bday_this_year = bday_date.replace(year=today.year + 1)
-
-            if today <= bday_this_year <= next_week:
-                if bday_this_year.weekday() >= 5:
-                    days_until_monday = (7 - bday_this_year.weekday())
-                    bday_this_year += timedelta(days=days_until_monday)
+            if bday_this_year.weekday() >= 5:
+                days_until_monday = (7 - bday_this_year.weekday())
+                bday_this_year += timedelta(days=days_until_monday)
 
-                upcoming_birthdays.append({
-                    "name": record.name.value,
-                    "congratulation_date": bday_this_year.strftime("%d.%m.%Y")
-                })
+            upcoming_birthdays.append({
+                "name": name,
+                "congratulation_date": bday_this_year.strftime("%d.%m.%Y")
+            })
 
         return upcoming_birthdays
 
@@ -272,10 +318,11 @@ def show_birthday(args, book: AddressBook):
 
 @input_error
 def upcoming_birthdays(args, book: AddressBook):
-    upcoming = book.get_upcoming_birthdays()
+    days = int(args[0]) if args else 7
+    upcoming = book.get_upcoming_birthdays(days)
 
     if not upcoming:
-        return "Наступного тижня немає іменинників."
+        return f"Найближчими {days} днями немає іменинників."
 
     output = "Майбутні дні народження:\n"
     for item in upcoming:
@@ -310,7 +357,7 @@ def main():
             print("How can I help you?")
 
         elif command in commands:
-            if command == "all" or command == "birthdays":
+            if command == "all":
                 print(commands[command](book))
             else:
                 print(commands[command](args, book))
@@ -321,7 +368,7 @@ def main():
                 "add to add contact, change to change contact, " \
                 "phone to show phone, all to show all contacts, " \
                 "add-birthday to add birthday, show-birthday to show birthday, " \
-                "birthdays to show upcoming birthdays.")
+                "birthdays [days] to show upcoming birthdays.")
 
 
 if __name__ == "__main__":
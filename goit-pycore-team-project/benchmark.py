@@ -0,0 +1,769 @@
+import argparse
+import asyncio
+import csv
+import gc
+import importlib.util
+import json
+import os
+import pickle
+import random
+import re
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from difflib import get_close_matches
+
+import main as bot
+
+IMPORT_TARGET_ROWS_PER_SEC = 10_000
+NOTES_PER_CONTACT = 100
+CONSONANTS = "bcdfghklmnprstvyz"
+VOWELS = "aeiou"
+FIRST_NAMES = 5_000
+FUZZY_QUERIES = 1000
+SUGGEST_SIZES = (30, 1_000, 10_000)
+SUGGEST_QUERIES = 200
+SAVE_ROUNDS = 20
+SUITE_SCALES = (1_000, 100_000, 1_000_000)
+SUITE_REPEATS = 5
+SUITE_IMPORT_ROWS = 1_000
+NOTE_WORDS = 2_000
+NOTE_LENGTH = 6
+NOTES_EPOCH = datetime(2026, 1, 1)
+NOTES_SPAN_DAYS = 365
+SERVE_CONNECTIONS = (1, 10, 100)
+SERVE_REQUESTS = 5_000
+SERVE_WRITE_SHARE = 0.2
+SHARD_COUNTS = (1, 2, 4, 8)
+SHARD_QUERIES = 50
+TAG_POOL = ("work", "home", "urgent", "family", "travel", "ideas", "bills", "health")
+VALIDATOR_CACHES = (
+    "is_valid_email",
+    "is_valid_phone",
+    "is_valid_address",
+    "parse_birthday",
+    "normalize_tag_part",
+)
+
+
+def generate_rows(count, seed=1):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "name": f"Contact{i:07d}",
+            "phones": [f"050{rng.randrange(10**7):07d}"],
+            "emails": [f"user{i}@mail.com"],
+            "addresses": [f"Kyiv, Street {rng.randrange(1, 500)}"],
+            "birthday": f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(1950, 2010)}",
+        }
+
+
+def write_rows(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            writer = csv.DictWriter(f, bot.CSV_FIELDS)
+            writer.writeheader()
+            for row in rows:
+                for field in ("phones", "emails", "addresses"):
+                    row[field] = ";".join(row[field])
+                writer.writerow(row)
+        else:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+
+
+def bench_import(rows, fmt, storage):
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, f"rows.{fmt}")
+        write_rows(source, generate_rows(rows))
+        book = bot.load_data(os.path.join(tmp, "book.db" if storage == "sqlite" else "book.pkl"))
+
+        started = time.perf_counter()
+        imported, created, error_count, _ = bot.import_contacts(book, source)
+        import_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        exported = bot.export_contacts(book, os.path.join(tmp, f"export.{fmt}"))
+        export_elapsed = time.perf_counter() - started
+        book.storage.close()
+
+    return {
+        "rows": rows,
+        "format": fmt,
+        "storage": storage,
+        "imported": imported,
+        "errors": error_count,
+        "import_seconds": round(import_elapsed, 3),
+        "import_rows_per_sec": round(imported / import_elapsed),
+        "export_rows_per_sec": round(exported / export_elapsed),
+    }
+
+
+@contextmanager
+def uncached_validators():
+    # The per-assignment re.fullmatch/strptime calls the fields used before
+    # the shared validation layer, for the "before" side of the records run.
+    saved = {name: getattr(bot, name) for name in VALIDATOR_CACHES}
+    bot.is_valid_email = lambda v: bool(
+        re.fullmatch(r"^[a-z0-9]+[\._]?[a-z0-9]+[@]\w+[.]\w+$", v)
+    )
+    bot.is_valid_phone = lambda v: bool(re.fullmatch(r"^\d{10}$", v))
+    bot.is_valid_address = lambda v: bool(re.fullmatch(r".{5,}", v))
+    bot.parse_birthday = lambda v: datetime.strptime(v, "%d.%m.%Y").date()
+    bot.normalize_tag_part = lambda p: re.sub(
+        r"[^\w\-]+", "", p.lstrip("#"), flags=re.UNICODE
+    )
+    try:
+        yield
+    finally:
+        for name, func in saved.items():
+            setattr(bot, name, func)
+
+
+def build_records(rows):
+    for row in rows:
+        record = bot.Record(row["name"])
+        for phone in row["phones"]:
+            record.add_phone(phone)
+        for email in row["emails"]:
+            record.add_email(email)
+        for address in row["addresses"]:
+            record.add_address(address)
+        record.add_birthday(row["birthday"])
+        record.add_note("Call back #work, #follow-up", ["work", "#Follow-Up"])
+
+
+def median_ms(timings):
+    return round(sorted(timings)[len(timings) // 2] * 1000, 3)
+
+
+def bench_save(rows, storage, seed=1):
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "rows.jsonl")
+        write_rows(source, generate_rows(rows))
+        data_path = os.path.join(tmp, "book.db" if storage == "sqlite" else "book.pkl")
+        book = bot.load_data(data_path)
+        bot.import_contacts(book, source)
+        bot.save_data(book, data_path)
+
+        mutate_timings = []
+        save_timings = []
+        for _ in range(SAVE_ROUNDS):
+            record = book.data[f"Contact{rng.randrange(rows):07d}"]
+            started = time.perf_counter()
+            record.edit_phone(record.phones[0].value, f"067{rng.randrange(10**7):07d}")
+            mutate_timings.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            bot.save_data(book, data_path)
+            save_timings.append(time.perf_counter() - started)
+
+        result = {
+            "rows": rows,
+            "storage": storage,
+            "mutation_ms": median_ms(mutate_timings),
+            "save_ms": median_ms(save_timings),
+        }
+        if storage == "journal":
+            # What save_data cost before: pickling the whole book for one change.
+            started = time.perf_counter()
+            with open(os.path.join(tmp, "full.pkl"), "wb") as f:
+                pickle.dump(book, f)
+            result["full_pickle_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        book.storage.close()
+    return result
+
+
+def bench_records(rows):
+    data = list(generate_rows(rows))
+    for name in VALIDATOR_CACHES:
+        getattr(bot, name).cache_clear()
+
+    with uncached_validators():
+        started = time.perf_counter()
+        build_records(data)
+        before = time.perf_counter() - started
+
+    started = time.perf_counter()
+    build_records(data)
+    after = time.perf_counter() - started
+
+    return {
+        "rows": rows,
+        "before_us_per_record": round(before / rows * 1e6, 2),
+        "after_us_per_record": round(after / rows * 1e6, 2),
+        "speedup": round(before / after, 2),
+    }
+
+
+def load_module(path):
+    spec = importlib.util.spec_from_file_location("baseline", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure_book(module, data):
+    gc.collect()
+    tracemalloc.start()
+    book = module.AddressBook()
+    for row in data:
+        record = module.Record(row["name"])
+        record.add_phone(row["phones"][0])
+        record.add_email(row["emails"][0])
+        record.add_address(row["addresses"][0])
+        record.add_birthday(row["birthday"])
+        record.add_note("Call back about the contract", ["work", "follow-up"])
+        record.add_note("Birthday present ideas", ["personal"])
+        book.add_record(record)
+    # The validator caches are bounded, so they are not part of the per-contact cost.
+    for name in VALIDATOR_CACHES:
+        if hasattr(module, name):
+            getattr(module, name).cache_clear()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(size / len(data))
+
+
+def bench_memory(rows, baseline=None):
+    data = list(generate_rows(rows))
+    result = {"rows": rows, "bytes_per_contact": measure_book(bot, data)}
+    if baseline:
+        result["baseline"] = baseline
+        result["baseline_bytes_per_contact"] = measure_book(load_module(baseline), data)
+        result["saved_percent"] = round(
+            100 * (1 - result["bytes_per_contact"] / result["baseline_bytes_per_contact"]), 1
+        )
+    return result
+
+
+def build_note_book(module, notes, seed=1):
+    rng = random.Random(seed)
+    book = module.AddressBook()
+    for i in range(notes // NOTES_PER_CONTACT):
+        record = module.Record(f"Contact{i:07d}")
+        for j in range(NOTES_PER_CONTACT):
+            record.add_note(f"Note {j} for contact {i}", rng.sample(TAG_POOL, rng.randint(0, 3)))
+        book.add_record(record)
+    return book
+
+
+def time_tag_queries(module, book):
+    # The paths that used to patch old notes with ensure_note_has_tags on every call,
+    # plus the search-tags/find-tags queries, through the public commands so an
+    # older main.py passed as --baseline runs the same workload.
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        if hasattr(book, "drop_indexes"):
+            # Start cold, so the first query pays for the lazy index build.
+            book.drop_indexes()
+        for i, (name, record) in enumerate(book.data.items()):
+            module.list_notes_cmd(
+                [name, "--sort", "tags", "--page-size", str(NOTES_PER_CONTACT)], book
+            )
+            for note in record.list_notes():
+                str(note)
+            first, second = TAG_POOL[i % len(TAG_POOL)], TAG_POOL[(i + 1) % len(TAG_POOL)]
+            module.search_tags_cmd([name, first], book)
+            module.search_tags_cmd([name, first, second, "--any"], book)
+        for i, tag in enumerate(TAG_POOL):
+            module.find_tags_cmd([tag], book)
+            module.find_tags_cmd([tag, TAG_POOL[(i + 1) % len(TAG_POOL)]], book)
+        return time.perf_counter() - started
+    finally:
+        gc.enable()
+
+
+def bench_tags(notes, baseline=None):
+    result = {"notes": notes, "seconds": round(time_tag_queries(bot, build_note_book(bot, notes)), 3)}
+    if baseline:
+        module = load_module(baseline)
+        result["baseline"] = baseline
+        result["baseline_seconds"] = round(
+            time_tag_queries(module, build_note_book(module, notes)), 3
+        )
+        result["saved_percent"] = round(
+            100 * (1 - result["seconds"] / result["baseline_seconds"]), 1
+        )
+    return result
+
+
+def generate_word(rng, syllables):
+    return "".join(
+        rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(syllables)
+    ).title()
+
+
+def generate_names(count, seed=1):
+    rng = random.Random(seed)
+    first_names = [generate_word(rng, rng.randint(2, 3)) for _ in range(FIRST_NAMES)]
+    last_names = [generate_word(rng, rng.randint(2, 4)) for _ in range(count // 10)]
+    names = set()
+    while len(names) < count:
+        names.add(f"{rng.choice(first_names)} {rng.choice(last_names)}")
+    return list(names)
+
+
+def misspell(name, rng):
+    i = rng.randrange(len(name))
+    if rng.random() < 0.5:
+        return name[:i] + name[i + 1 :]
+    return name[:i] + rng.choice("aeiouklmnrst") + name[i + 1 :]
+
+
+def bench_fuzzy(rows, seed=1):
+    rng = random.Random(seed)
+    names = generate_names(rows, seed)
+    started = time.perf_counter()
+    index = bot.NameIndex()
+    index.build(names)
+    build_elapsed = time.perf_counter() - started
+
+    timings = []
+    hits = 0
+    for name in rng.sample(names, FUZZY_QUERIES):
+        query = misspell(name, rng)
+        started = time.perf_counter()
+        found = index.closest(query)
+        timings.append(time.perf_counter() - started)
+        hits += name in found
+    timings.sort()
+    return {
+        "names": rows,
+        "build_seconds": round(build_elapsed, 3),
+        "median_ms": round(timings[len(timings) // 2] * 1000, 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95)] * 1000, 3),
+        "recall_at_k": round(hits / FUZZY_QUERIES, 3),
+    }
+
+
+def scan_suggestions(cmd, options):
+    # The difflib plus prefix/infix scan main() ran on every unknown command.
+    opts = list(options)
+    fuzzy = get_close_matches(cmd, opts, n=5, cutoff=0.5)
+    prefix = [o for o in opts if o.startswith(cmd)]
+    infix = [o for o in opts if cmd in o]
+    return list(dict.fromkeys(fuzzy + prefix + infix))[:5]
+
+
+def generate_book(contacts, notes_per_contact=2, tag_count=50, seed=1):
+    rng = random.Random(seed)
+    words = [generate_word(rng, rng.randint(2, 4)).lower() for _ in range(NOTE_WORDS)]
+    tags = [f"tag{i}" for i in range(tag_count)]
+    newest = bot.to_micros(NOTES_EPOCH)
+    span = NOTES_SPAN_DAYS * 24 * 3600 * 10**6
+    book = bot.AddressBook()
+    for row in generate_rows(contacts, seed):
+        record = bot.Record(row["name"])
+        record.add_phone(row["phones"][0])
+        record.add_email(row["emails"][0])
+        record.add_address(row["addresses"][0])
+        record.add_birthday(row["birthday"])
+        for _ in range(notes_per_contact):
+            record.add_note(
+                " ".join(rng.choices(words, k=NOTE_LENGTH)),
+                rng.sample(tags, rng.randint(0, min(3, tag_count))),
+            )
+        for note in record.notes.values():
+            note.created_us = note.updated_us = newest - rng.randrange(span)
+        book.add_record(record)
+    return book, words, tags
+
+
+def suite_args(book, words, tags, tmp):
+    # One argument list per call of each command; mutating commands get fresh targets.
+    rng = random.Random(len(book.data))
+    names = list(book.data)
+    since = NOTES_EPOCH - timedelta(days=30)
+    import_path = os.path.join(tmp, "import.jsonl")
+    rows = list(generate_rows(SUITE_IMPORT_ROWS, seed=2))
+    for i, row in enumerate(rows):
+        row["name"] = f"Imported{i:07d}"
+    write_rows(import_path, rows)
+
+    def record():
+        return book.data[rng.choice(names)]
+
+    def last_note(record):
+        return [record.name.value, str(max(record.notes, default=1))]
+
+    def stats_args(i):
+        # stats formats what --stats collected; give it one entry per command.
+        if bot.command_stats is None:
+            stats = bot.enable_command_stats()
+            for func in bot.commands.values():
+                stats.record(func.__name__, 0.001, "")
+        return []
+
+    return {
+        "add": lambda i: [f"Suite{i:07d}", "0501234567"],
+        "add-address": lambda i: [rng.choice(names), "Kyiv, Street 1"],
+        "add-email": lambda i: [rng.choice(names), f"suite{i}@mail.com"],
+        "change": lambda i: (lambda r: [r.name.value, r.phones[0].value, f"067{i:07d}"])(record()),
+        "delete": lambda i: [f"Suite{i:07d}"],
+        "all": lambda i: ["--sort", "name"],
+        "add-birthday": lambda i: [rng.choice(names), "01.02.1990"],
+        "show-birthday": lambda i: [rng.choice(names)],
+        "birthdays": lambda i: ["7"],
+        "add-note": lambda i: [rng.choice(names), *rng.choices(words, k=NOTE_LENGTH), "tags:", rng.choice(tags)],
+        "phone": lambda i: [rng.choice(names)],
+        "who-has": lambda i: [record().phones[0].value],
+        "find": lambda i: [rng.choice(names)[:-2]],
+        "list-notes": lambda i: [rng.choice(names), "--sort", "tags"],
+        "search-notes": lambda i: [rng.choice(names), rng.choice(words)],
+        "edit-note": lambda i: [*last_note(record()), *rng.choices(words, k=NOTE_LENGTH)],
+        "delete-note": lambda i: last_note(record()),
+        "find-notes": lambda i: [rng.choice(words)],
+        "rank-notes": lambda i: rng.sample(words, 2),
+        "notes-since": lambda i: [since.strftime("%d.%m.%Y")],
+        "notes-between": lambda i: [since.strftime("%d.%m.%Y"), NOTES_EPOCH.strftime("%d.%m.%Y")],
+        "add-tags": lambda i: [*last_note(record()), rng.choice(tags)],
+        "remove-tags": lambda i: [*last_note(record()), rng.choice(tags)],
+        "clear-tags": lambda i: last_note(record()),
+        "search-tags": lambda i: [rng.choice(names), rng.choice(tags)],
+        "find-tags": lambda i: [*rng.sample(tags, min(2, len(tags))), "--any"],
+        "import": lambda i: [import_path],
+        "export": lambda i: [os.path.join(tmp, "export.jsonl")],
+        "save-stats": lambda i: [],
+        "stats": stats_args,
+    }
+
+
+def bench_suite(contacts, notes_per_contact, tag_count, repeats=SUITE_REPEATS):
+    started = time.perf_counter()
+    book, words, tags = generate_book(contacts, notes_per_contact, tag_count)
+    results = [
+        {
+            "contacts": contacts,
+            "command": "generate",
+            "first_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        args_for = suite_args(book, words, tags, tmp)
+        for command, func in bot.commands.items():
+            if command not in args_for:
+                results.append({"contacts": contacts, "command": command, "skipped": True})
+                continue
+            timings = []
+            for i in range(repeats):
+                args = args_for[command](i)
+                started = time.perf_counter()
+                func(args, book)
+                timings.append(time.perf_counter() - started)
+            results.append(
+                {
+                    "contacts": contacts,
+                    "command": command,
+                    "first_ms": round(timings[0] * 1000, 3),
+                    "median_ms": median_ms(timings[1:] or timings),
+                }
+            )
+        bot.command_stats = None
+
+        # Time the real storages, not the pickle path of a book without one.
+        export_path = os.path.join(tmp, "book.jsonl")
+        bot.export_contacts(book, export_path)
+        names = list(book.data)
+        for storage in ("journal", "sqlite"):
+            path = os.path.join(tmp, "book.db" if storage == "sqlite" else "book.pkl")
+            stored = bot.load_data(path)
+            bot.import_contacts(stored, export_path)
+            bot.save_data(stored, path)
+            timings = []
+            for i in range(repeats):
+                stored.data[names[i % len(names)]].add_note(f"suite save {i}")
+                started = time.perf_counter()
+                bot.save_data(stored, path)
+                timings.append(time.perf_counter() - started)
+            stored.storage.close()
+            results.append(
+                {
+                    "contacts": contacts,
+                    "command": "save_data",
+                    "storage": storage,
+                    "median_ms": median_ms(timings),
+                }
+            )
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                loaded = bot.load_data(path)
+                timings.append(time.perf_counter() - started)
+                loaded.storage.close()
+            results.append(
+                {
+                    "contacts": contacts,
+                    "command": "load_data",
+                    "storage": storage,
+                    "median_ms": median_ms(timings),
+                }
+            )
+    for result in results:
+        result["notes_per_contact"] = notes_per_contact
+        result["tags"] = tag_count
+    return results
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def send_command(reader, writer, line):
+    writer.write((line + "\n").encode("utf-8"))
+    await writer.drain()
+    while await reader.readline() not in (b".\n", b""):
+        pass
+
+
+async def run_client(port, requests, names, tags, rng, timings):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for i in range(requests):
+        name = rng.choice(names)
+        if rng.random() < SERVE_WRITE_SHARE:
+            line = f"add-note {name} load test note tags: {rng.choice(tags)}"
+        else:
+            line = rng.choice(
+                (
+                    f"phone {name}",
+                    f"show-birthday {name}",
+                    f"find {name[:-2]}",
+                    f"search-tags {name} {rng.choice(tags)}",
+                    f"find-tags {rng.choice(tags)} --top 5",
+                )
+            )
+        started = time.perf_counter()
+        await send_command(reader, writer, line)
+        timings.append(time.perf_counter() - started)
+    writer.write(b"exit\n")
+    await writer.drain()
+    writer.close()
+
+
+async def load_test(port, connections, names, tags, seed=1):
+    timings = []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            run_client(
+                port, SERVE_REQUESTS // connections, names, tags, random.Random(seed + i), timings
+            )
+            for i in range(connections)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    return {
+        "connections": connections,
+        "requests": len(timings),
+        "requests_per_sec": round(len(timings) / elapsed),
+        "p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95)] * 1000, 3),
+        "p99_ms": round(timings[int(len(timings) * 0.99)] * 1000, 3),
+    }
+
+
+def bench_serve(rows, connection_counts=SERVE_CONNECTIONS):
+    book, _, tags = generate_book(rows)
+    names = list(book.data)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "book.pkl")
+        bot.save_data(book, path)
+        del book
+        port = free_port()
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                os.path.abspath(bot.__file__),
+                "--data",
+                path,
+                "--serve",
+                f"127.0.0.1:{port}",
+                "--autosave-every",
+                "0",
+                "--autosave-interval",
+                "0",
+            ],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            server.stdout.readline()
+            for connections in connection_counts:
+                result = asyncio.run(load_test(port, connections, names, tags))
+                result["rows"] = rows
+                results.append(result)
+        finally:
+            server.send_signal(signal.SIGINT)
+            server.communicate()
+    return results
+
+
+def time_global_search(book, text_queries, tag_queries):
+    timings = []
+    for query in text_queries:
+        started = time.perf_counter()
+        book.search_notes_global(query)
+        timings.append(time.perf_counter() - started)
+    for tags in tag_queries:
+        started = time.perf_counter()
+        book.search_notes_by_tags_global(tags, match_all=False, limit=bot.RANK_LIMIT)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def bench_shards(rows, shard_counts=SHARD_COUNTS, seed=1):
+    rng = random.Random(seed)
+    book, words, tags = generate_book(rows, seed=seed)
+    # Two-letter prefixes expand to many terms, the broad queries sharding is for.
+    text_queries = [rng.choice(words)[:2] for _ in range(SHARD_QUERIES)]
+    tag_queries = [rng.sample(tags, 3) for _ in range(SHARD_QUERIES)]
+    results = []
+    for shards in (0, *shard_counts):
+        book.drop_indexes()
+        book.shard_count = shards
+        started = time.perf_counter()
+        if shards:
+            book.ensure_shard_search()
+        else:
+            book.ensure_text_index()
+            book.ensure_tag_index()
+        build_elapsed = time.perf_counter() - started
+        timings = time_global_search(book, text_queries, tag_queries)
+        results.append(
+            {
+                "contacts": rows,
+                "shards": shards,
+                "cpus": os.cpu_count(),
+                "build_seconds": round(build_elapsed, 3),
+                "median_ms": median_ms(timings),
+                "p95_ms": round(sorted(timings)[int(len(timings) * 0.95)] * 1000, 3),
+            }
+        )
+    book.drop_indexes()
+    return results
+
+
+def bench_suggest(seed=1):
+    rng = random.Random(seed)
+    results = []
+    for size in SUGGEST_SIZES:
+        registry = bot.CommandRegistry(bot.commands)
+        while len(registry) < size:
+            name = f"{generate_word(rng, 2).lower()}-{generate_word(rng, 2).lower()}"
+            registry[name] = None
+        queries = [misspell(name, rng) for name in rng.choices(list(registry), k=SUGGEST_QUERIES)]
+
+        started = time.perf_counter()
+        for query in queries:
+            scan_suggestions(query, registry.keys())
+        scan_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for query in queries:
+            registry.suggest(query)
+        index_elapsed = time.perf_counter() - started
+
+        results.append(
+            {
+                "commands": size,
+                "scan_us_per_query": round(scan_elapsed / SUGGEST_QUERIES * 1e6, 1),
+                "index_us_per_query": round(index_elapsed / SUGGEST_QUERIES * 1e6, 1),
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the assistant bot")
+    parser.add_argument(
+        "scenario",
+        choices=[
+            "import",
+            "records",
+            "memory",
+            "tags",
+            "fuzzy",
+            "suggest",
+            "save",
+            "suite",
+            "serve",
+            "shards",
+        ],
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument(
+        "--storage", nargs="*", choices=["journal", "sqlite"], default=["journal", "sqlite"]
+    )
+    parser.add_argument(
+        "--format", nargs="*", choices=["csv", "jsonl"], default=["csv", "jsonl"]
+    )
+    parser.add_argument(
+        "--baseline", help="main.py of an older revision to compare memory against"
+    )
+    parser.add_argument("--scales", nargs="*", type=int, default=list(SUITE_SCALES))
+    parser.add_argument("--notes-per-contact", type=int, default=2)
+    parser.add_argument("--tags", type=int, default=50, help="size of the tag vocabulary")
+    parser.add_argument(
+        "--connections", nargs="*", type=int, default=list(SERVE_CONNECTIONS)
+    )
+    parser.add_argument("--shards", nargs="*", type=int, default=list(SHARD_COUNTS))
+    parser.add_argument("--repeats", type=int, default=SUITE_REPEATS)
+    parser.add_argument("--output", help="also write the suite results to this JSON file")
+    options = parser.parse_args()
+
+    if options.scenario == "import":
+        for storage in options.storage:
+            for fmt in options.format:
+                result = bench_import(options.rows, fmt, storage)
+                result["target_rows_per_sec"] = IMPORT_TARGET_ROWS_PER_SEC
+                result["meets_target"] = (
+                    result["import_rows_per_sec"] >= IMPORT_TARGET_ROWS_PER_SEC
+                )
+                print(json.dumps(result))
+    elif options.scenario == "records":
+        print(json.dumps(bench_records(options.rows)))
+    elif options.scenario == "memory":
+        print(json.dumps(bench_memory(options.rows, options.baseline)))
+    elif options.scenario == "tags":
+        print(json.dumps(bench_tags(options.rows, options.baseline)))
+    elif options.scenario == "fuzzy":
+        print(json.dumps(bench_fuzzy(options.rows)))
+    elif options.scenario == "suite":
+        results = []
+        for contacts in options.scales:
+            for result in bench_suite(
+                contacts, options.notes_per_contact, options.tags, options.repeats
+            ):
+                print(json.dumps(result))
+                results.append(result)
+        if options.output:
+            with open(options.output, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+    elif options.scenario == "shards":
+        for result in bench_shards(options.rows, options.shards):
+            print(json.dumps(result))
+    elif options.scenario == "serve":
+        for result in bench_serve(options.rows, options.connections):
+            print(json.dumps(result))
+    elif options.scenario == "save":
+        for storage in options.storage:
+            print(json.dumps(bench_save(options.rows, storage)))
+    elif options.scenario == "suggest":
+        for result in bench_suggest():
+            print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
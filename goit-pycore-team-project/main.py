@@ -1,23 +1,24 @@
+import argparse
+import heapq
+import json
+import math
+import os
 import pickle
 import re
-from collections import UserDict
-from datetime import datetime, timedelta
-from difflib import get_close_matches
-
-try:
-    from prompt_toolkit import prompt as pt_prompt
-    from prompt_toolkit.completion import WordCompleter
-
-    HAVE_PT = True
-except Exception:
-    HAVE_PT = False
-
-    def pt_prompt(message, **kwargs):
-        return input(message)
-
-    class WordCompleter:
-        def __init__(self, words, ignore_case=False):
-            self.words = words
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter, OrderedDict, UserDict
+from collections.abc import MutableMapping
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from itertools import islice
+from datetime import date, datetime, timedelta
+from functools import lru_cache, wraps
+
+# asyncio, calendar, concurrent.futures, csv, sqlite3 and prompt_toolkit are
+# imported where they are used, so the prompt comes up without paying for the
+# ones a session never needs.
 
 
 BLACK = "\033[30m"
@@ -42,6 +43,64 @@ WHITE_BG = "\033[47m"
 LIGHT_GRAY_BG = "\033[100m"
 RESET_BG = "\033[0m"
 
+JOURNAL_COMPACT_EVERY = 1000
+RECORD_CACHE_SIZE = 1024
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+TOKEN_RE = re.compile(r"\w+")
+NON_DIGIT_RE = re.compile(r"\D")
+EMAIL_RE = re.compile(r"^[a-z0-9]+[\._]?[a-z0-9]+[@]\w+[.]\w+$")
+PHONE_RE = re.compile(r"^\d{10}$")
+ADDRESS_RE = re.compile(r".{5,}")
+TAG_SPLIT_RE = re.compile(r"[,\s]+")
+TAG_CLEAN_RE = re.compile(r"[^\w\-]+", re.UNICODE)
+VALIDATOR_CACHE_SIZE = 65536
+FIND_LIMIT = 20
+FUZZY_LIMIT = 5
+FUZZY_MAX_EDITS = 2
+NGRAM_SIZE = 4
+FUZZY_RERANK = 3
+SUGGEST_LIMIT = 5
+RANK_LIMIT = 10
+TIMELINE_LIMIT = 50
+NOTES_PAGE_SIZE = 50
+BM25_K1 = 1.2
+BM25_B = 0.75
+SUGGEST_MAX_EDITS = 2
+ALL_PAGE_SIZE = 50
+ALL_SORT_KEYS = (None, "name", "birthday", "notes")
+IMPORT_BATCH_SIZE = 1000
+IMPORT_ERRORS_SHOWN = 10
+STARTUP_IMPORTS_SHOWN = 8
+CSV_FIELDS = ("name", "phones", "emails", "addresses", "birthday")
+LEAP_YEAR = 2000
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+SCHEMA_VERSION = 2
+AUTOSAVE_EVERY = 100
+AUTOSAVE_INTERVAL = 30.0
+AUTOSAVE_POLL = 0.5
+HISTOGRAM_STEPS = 8
+SERVER_WORKERS = 8
+READ_ONLY_COMMANDS = frozenset({
+    "all",
+    "show-birthday",
+    "birthdays",
+    "phone",
+    "who-has",
+    "find",
+    "list-notes",
+    "search-notes",
+    "find-notes",
+    "rank-notes",
+    "notes-since",
+    "notes-between",
+    "search-tags",
+    "find-tags",
+    "export",
+    "save-stats",
+    "stats",
+})
+
 
 class ContactError(Exception):
     pass
@@ -70,47 +129,259 @@ class NoteNotFoundError(ContactError):
     pass
 
 
+class LatencyHistogram:
+    __slots__ = ("buckets", "count")
+
+    def __init__(self):
+        self.buckets = Counter()
+        self.count = 0
+
+    def add(self, seconds):
+        micros = max(seconds * 1e6, 1.0)
+        self.buckets[int(math.log2(micros) * HISTOGRAM_STEPS)] += 1
+        self.count += 1
+
+    def quantile(self, q):
+        rank = q * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return 2 ** ((bucket + 1) / HISTOGRAM_STEPS) / 1000
+        return 0.0
+
+
+class CommandStat:
+    __slots__ = ("calls", "latency", "errors", "result_chars", "max_result_chars")
+
+    def __init__(self):
+        self.calls = 0
+        self.latency = LatencyHistogram()
+        self.errors = Counter()
+        self.result_chars = 0
+        self.max_result_chars = 0
+
+
+class CommandStats:
+    def __init__(self):
+        self.commands: dict[str, CommandStat] = {}
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds, result, error=None):
+        size = len(result) if isinstance(result, str) else 0
+        with self.lock:
+            stat = self.commands.get(name)
+            if stat is None:
+                stat = self.commands[name] = CommandStat()
+            stat.calls += 1
+            stat.latency.add(seconds)
+            if error is not None:
+                stat.errors[type(error).__name__] += 1
+            stat.result_chars += size
+            stat.max_result_chars = max(stat.max_result_chars, size)
+
+    def summary(self, names=None):
+        names = names or {}
+        return {
+            names.get(key, key): {
+                "calls": stat.calls,
+                "p50_ms": round(stat.latency.quantile(0.5), 3),
+                "p95_ms": round(stat.latency.quantile(0.95), 3),
+                "p99_ms": round(stat.latency.quantile(0.99), 3),
+                "errors": dict(stat.errors),
+                "avg_result_chars": stat.result_chars // stat.calls,
+                "max_result_chars": stat.max_result_chars,
+            }
+            for key, stat in sorted(self.commands.items(), key=lambda item: -item[1].calls)
+        }
+
+
+command_stats = None
+
+
+def enable_command_stats():
+    global command_stats
+    command_stats = CommandStats()
+    return command_stats
+
+
+def error_message(e):
+    if isinstance(e, ValueError):
+        return "⚠️  Invalid format. Check that the arguments are entered correctly.\n"
+    if isinstance(e, IndexError):
+        return "⚠️  Insufficient arguments. Enter a command, name, and optionally a value.\n"
+    if isinstance(e, KeyError):
+        return "ℹ️  Contact not found.\n"
+    if isinstance(
+        e,
+        (
+            PhoneValidationError,
+            DateValidationError,
+            RecordNotFoundError,
+            AddressValidationError,
+            EmailValidationError,
+            NoteNotFoundError,
+        ),
+    ):
+        return str(e)
+    return f"⚠️  Raised other error: {e}"
+
+
 def input_error(func):
+    @wraps(func)
     def wrapper(*args, **kwargs):
+        stats = command_stats
+        if stats is None:
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                return error_message(e)
+        started = time.perf_counter()
+        error = None
         try:
-            return func(*args, **kwargs)
-        except ValueError:
-            return (
-                "⚠️  Invalid format. Check that the arguments are entered correctly.\n"
-            )
-        except IndexError:
-            return "⚠️  Insufficient arguments. Enter a command, name, and optionally a value.\n"
-        except KeyError:
-            return "ℹ️  Contact not found.\n"
-        except PhoneValidationError as e:
-            return str(e)
-        except DateValidationError as e:
-            return str(e)
-        except RecordNotFoundError as e:
-            return str(e)
-        except AddressValidationError as e:
-            return str(e)
-        except EmailValidationError as e:
-            return str(e)
-        except NoteNotFoundError as e:
-            return str(e)
+            result = func(*args, **kwargs)
         except Exception as e:
-            return f"⚠️  Raised other error: {e}"
+            error = e
+            result = error_message(e)
+        stats.record(func.__name__, time.perf_counter() - started, result, error)
+        return result
 
     return wrapper
 
 
 def save_data(book, filename="addressbook.pkl"):
-    with open(filename, "wb") as f:
+    if book.storage is not None:
+        book.storage.sync()
+        return
+    tmp_path = filename + ".tmp"
+    with open(tmp_path, "wb") as f:
         pickle.dump(book, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filename)
 
 
-def load_data(filename="addressbook.pkl"):
+def fsync_dir(path):
+    if os.name == "nt":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def read_snapshot(filename):
     try:
         with open(filename, "rb") as f:
-            return pickle.load(f)
+            book = pickle.load(f)
     except FileNotFoundError:
         return AddressBook()
+    book.attach()
+    return book
+
+
+def load_data(filename="addressbook.pkl"):
+    if filename.endswith(SQLITE_SUFFIXES):
+        return SqliteStorage(filename).open_book()
+    book = read_snapshot(filename)
+    journal = Journal(filename)
+    journal.replay(book)
+    journal.open()
+    book.storage = journal
+    if book.data and book.schema_version < SCHEMA_VERSION:
+        journal.compact()
+    return book
+
+
+class AutoSaver:
+    def __init__(self, book, filename, every=AUTOSAVE_EVERY, interval=AUTOSAVE_INTERVAL):
+        self.book = book
+        self.filename = filename
+        self.every = every
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.saved_changes = book.changes
+        self.saved_at = time.monotonic()
+        self.saves = 0
+        self.last_seconds = 0.0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.book.autosaver = self
+        self._thread.start()
+        return self
+
+    def pending(self):
+        return self.book.changes - self.saved_changes
+
+    def due(self):
+        pending = self.pending()
+        if not pending:
+            return False
+        if self.every and pending >= self.every:
+            return True
+        return bool(self.interval) and time.monotonic() - self.saved_at >= self.interval
+
+    def _run(self):
+        while not self._stopped.wait(AUTOSAVE_POLL):
+            if self.due():
+                self.save()
+
+    def save(self):
+        with self.lock:
+            changes = self.book.changes
+            started = time.perf_counter()
+            save_data(self.book, self.filename)
+            elapsed = time.perf_counter() - started
+            self.saved_changes = changes
+        self.saved_at = time.monotonic()
+        self.saves += 1
+        self.last_seconds = elapsed
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self.book.autosaver = None
+
+    def stats(self):
+        return {
+            "saves": self.saves,
+            "last_ms": round(self.last_seconds * 1000, 3),
+            "avg_ms": round(self.total_seconds / self.saves * 1000, 3) if self.saves else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "pending": self.pending(),
+        }
+
+
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def is_valid_email(value: str) -> bool:
+    return EMAIL_RE.fullmatch(value) is not None
+
+
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def is_valid_phone(value: str) -> bool:
+    return PHONE_RE.fullmatch(value) is not None
+
+
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def is_valid_address(value: str) -> bool:
+    return ADDRESS_RE.fullmatch(value) is not None
+
+
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def parse_birthday(value: str) -> date:
+    return datetime.strptime(value, "%d.%m.%Y").date()
+
+
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def normalize_tag_part(part: str) -> str:
+    return sys.intern(TAG_CLEAN_RE.sub("", part.lstrip("#")))
 
 
 def normalize_tags(tags: list[str]) -> list[str]:
@@ -122,12 +393,11 @@ def normalize_tags(tags: list[str]) -> list[str]:
         cleaned = raw.strip().lower()
         if cleaned.startswith("tags:"):
             cleaned = cleaned[5:].strip()
-        parts = re.split(r"[,\s]+", cleaned)
+        parts = TAG_SPLIT_RE.split(cleaned)
         for part in parts:
             if not part:
                 continue
-            part = part.lstrip("#")
-            part = re.sub(r"[^\w\-]+", "", part, flags=re.UNICODE)
+            part = normalize_tag_part(part)
             if not part:
                 continue
             if part not in seen:
@@ -142,9 +412,51 @@ def split_tags_string(raw: str) -> list[str]:
     return normalize_tags(parts)
 
 
-def ensure_note_has_tags(note):
-    if not hasattr(note, "tags"):
-        note.tags = []
+def to_micros(moment: datetime) -> int:
+    return (moment - EPOCH) // MICROSECOND
+
+
+def from_micros(micros: int) -> datetime:
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def migrate_note_state(state):
+    version = state.get("version", 1 if "created_us" in state else 0)
+    if version < 1:
+        state.setdefault("tags", ())
+        created = state["created_at"]
+        state["created_us"] = to_micros(created)
+        state["updated_us"] = to_micros(state.get("updated_at", created))
+    return state
+
+
+def migrate_record_state(state):
+    if state.get("version", 0) < 1:
+        for field in ("addresses", "phones", "emails", "notes"):
+            state.setdefault(field, [])
+        state.setdefault("birthday", None)
+        state.setdefault(
+            "next_note_id", max((n.id for n in state["notes"]), default=0) + 1
+        )
+    if state.get("version", 0) < 2:
+        state["notes"] = {note.id: note for note in state["notes"]}
+    return state
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.casefold())
+
+
+def normalize_phone(value: str) -> str:
+    return NON_DIGIT_RE.sub("", value)
+
+
+def normalize_email(value: str) -> str:
+    return value.strip().casefold()
+
+
+def normalize_address(value: str) -> str:
+    return " ".join(value.split()).casefold()
 
 
 def normalize_note_text(raw: str) -> str:
@@ -154,10 +466,740 @@ def normalize_note_text(raw: str) -> str:
     return t
 
 
+class TextIndex:
+    def __init__(self):
+        self.postings: dict[str, set[tuple[str, int]]] = {}
+        self.terms: list[str] = []
+        self.docs: dict[tuple[str, int], set[str]] = {}
+
+    def build(self, records):
+        for record in records:
+            for note in record.notes.values():
+                key = (record.name.value, note.id)
+                tokens = set(tokenize(note.text))
+                self.docs[key] = tokens
+                for token in tokens:
+                    self.postings.setdefault(token, set()).add(key)
+        self.terms = sorted(self.postings)
+
+    def add(self, key, text):
+        tokens = set(tokenize(text))
+        old_tokens = self.docs.get(key)
+        if old_tokens == tokens:
+            return
+        old_tokens = old_tokens or set()
+        self.docs[key] = tokens
+        for token in old_tokens - tokens:
+            self._unlink(token, key)
+        for token in tokens - old_tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = set()
+                insort(self.terms, token)
+            posting.add(key)
+
+    def remove(self, key):
+        for token in self.docs.pop(key, ()):
+            self._unlink(token, key)
+
+    def _unlink(self, token, key):
+        posting = self.postings[token]
+        posting.discard(key)
+        if not posting:
+            del self.postings[token]
+            del self.terms[bisect_left(self.terms, token)]
+
+    def expand(self, prefix):
+        start = bisect_left(self.terms, prefix)
+        end = bisect_left(self.terms, prefix + "\U0010ffff", start)
+        return self.terms[start:end]
+
+    def search(self, query) -> set[tuple[str, int]]:
+        result = None
+        for word in set(tokenize(query)):
+            matches = set()
+            for term in self.expand(word):
+                matches |= self.postings[term]
+            result = matches if result is None else result & matches
+            if not result:
+                break
+        return result or set()
+
+
+class SqliteTextIndex:
+    def __init__(self, storage):
+        self.storage = storage
+        self.conn = storage.conn
+
+    def _count(self, word):
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM terms WHERE term >= ? AND term < ?",
+            (word, prefix_bound(word)),
+        ).fetchone()[0]
+
+    def search(self, query) -> set[tuple[str, int]]:
+        words = set(tokenize(query))
+        if not words:
+            return set()
+        self.storage.flush()
+        # Candidates come from the rarest word; every word is then checked
+        # against the note text, since the terms table also holds tag words.
+        rarest = min(words, key=self._count)
+        found = set()
+        for name, note_id, text in self.conn.execute(
+            "SELECT t.name, t.note_id, n.text FROM terms t "
+            "JOIN notes n ON n.name = t.name AND n.id = t.note_id "
+            "WHERE t.term >= ? AND t.term < ?",
+            (rarest, prefix_bound(rarest)),
+        ).fetchall():
+            tokens = tokenize(text)
+            if all(any(t.startswith(w) for t in tokens) for w in words):
+                found.add((name, note_id))
+        return found
+
+
+def note_terms(note) -> Counter:
+    terms = Counter(tokenize(note.text))
+    for tag in note.tags:
+        terms.update(tokenize(tag))
+    return terms
+
+
+class Bm25:
+    def search(self, query, limit=RANK_LIMIT) -> list[tuple[tuple[str, int], float]]:
+        count, total_length = self.stats()
+        if not count:
+            return []
+        average = total_length / count
+        scores: dict[tuple[str, int], float] = {}
+        for term in set(tokenize(query)):
+            matches = self.matches(term)
+            if not matches:
+                continue
+            idf = math.log(1 + (count - len(matches) + 0.5) / (len(matches) + 0.5))
+            for key, tf, length in matches:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average)
+                scores[key] = scores.get(key, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        top = heapq.nsmallest(limit, ((-score, key) for key, score in scores.items()))
+        return [(key, -score) for score, key in top]
+
+
+class RankIndex(Bm25):
+    def __init__(self):
+        self.postings: dict[str, dict[tuple[str, int], int]] = {}
+        self.docs: dict[tuple[str, int], tuple[str, ...]] = {}
+        self.lengths: dict[tuple[str, int], int] = {}
+        self.total_length = 0
+
+    def build(self, records):
+        for record in records:
+            for note in record.notes.values():
+                self.add((record.name.value, note.id), note_terms(note))
+
+    def add(self, key, terms):
+        self.remove(key)
+        length = sum(terms.values())
+        self.docs[key] = tuple(terms)
+        self.lengths[key] = length
+        self.total_length += length
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[key] = tf
+
+    def remove(self, key):
+        if key not in self.docs:
+            return
+        self.total_length -= self.lengths.pop(key)
+        for term in self.docs.pop(key):
+            posting = self.postings[term]
+            del posting[key]
+            if not posting:
+                del self.postings[term]
+
+    def stats(self):
+        return len(self.lengths), self.total_length
+
+    def matches(self, term):
+        lengths = self.lengths
+        return [(key, tf, lengths[key]) for key, tf in self.postings.get(term, {}).items()]
+
+
+class TagIndex:
+    def __init__(self):
+        self.postings: dict[str, list[tuple[str, int]]] = {}
+        self.docs: dict[tuple[str, int], set[str]] = {}
+
+    def build(self, records):
+        for record in records:
+            for note in record.notes.values():
+                if not note.tags:
+                    continue
+                key = (record.name.value, note.id)
+                self.docs[key] = set(note.tags)
+                for tag in self.docs[key]:
+                    self.postings.setdefault(tag, []).append(key)
+        for posting in self.postings.values():
+            posting.sort()
+
+    def add(self, key, tags):
+        new_tags = set(tags)
+        old_tags = self.docs.get(key, set())
+        if new_tags == old_tags:
+            return
+        for tag in old_tags - new_tags:
+            self._unlink(tag, key)
+        for tag in new_tags - old_tags:
+            insort(self.postings.setdefault(tag, []), key)
+        if new_tags:
+            self.docs[key] = new_tags
+        else:
+            self.docs.pop(key, None)
+
+    def remove(self, key):
+        for tag in self.docs.pop(key, ()):
+            self._unlink(tag, key)
+
+    def _unlink(self, tag, key):
+        posting = self.postings[tag]
+        del posting[bisect_left(posting, key)]
+        if not posting:
+            del self.postings[tag]
+
+    @staticmethod
+    def _contains(posting, key):
+        i = bisect_left(posting, key)
+        return i < len(posting) and posting[i] == key
+
+    def posting(self, tag, name=None):
+        posting = self.postings.get(tag, [])
+        if name is None:
+            return posting
+        start = bisect_left(posting, (name,))
+        end = bisect_left(posting, (name, float("inf")), start)
+        return posting[start:end]
+
+    def match(self, tags, match_all=True, name=None) -> dict[tuple[str, int], int]:
+        postings = sorted((self.posting(t, name) for t in tags), key=len)
+        if match_all:
+            smallest, *rest = postings
+            return {
+                key: len(postings)
+                for key in smallest
+                if all(self._contains(p, key) for p in rest)
+            }
+        counts: dict[tuple[str, int], int] = {}
+        for posting in postings:
+            for key in posting:
+                counts[key] = counts.get(key, 0) + 1
+        return counts
+
+
+class SqliteTagIndex:
+    def __init__(self, storage):
+        self.storage = storage
+        self.conn = storage.conn
+
+    def match(self, tags, match_all=True, name=None) -> dict[tuple[str, int], int]:
+        self.storage.flush()
+        tags = list(dict.fromkeys(tags))
+        sql = (
+            f"SELECT name, note_id, COUNT(DISTINCT tag) FROM tags "
+            f"WHERE tag IN ({','.join('?' * len(tags))})"
+        )
+        params = list(tags)
+        if name is not None:
+            sql += " AND name = ?"
+            params.append(name)
+        sql += " GROUP BY name, note_id"
+        if match_all:
+            sql += " HAVING COUNT(DISTINCT tag) = ?"
+            params.append(len(tags))
+        return {
+            (note_name, note_id): count
+            for note_name, note_id, count in self.conn.execute(sql, params)
+        }
+
+
+shard_indexes = None
+
+
+def load_shard(records):
+    global shard_indexes
+    text_index = TextIndex()
+    text_index.build(records)
+    tag_index = TagIndex()
+    tag_index.build(records)
+    shard_indexes = (text_index, tag_index)
+
+
+def search_shard_text(query):
+    return shard_indexes[0].search(query)
+
+
+def match_shard_tags(tags, match_all):
+    return shard_indexes[1].match(tags, match_all=match_all)
+
+
+def update_shard_note(key, text, tags):
+    shard_indexes[0].add(key, text)
+    shard_indexes[1].add(key, tags)
+
+
+def remove_shard_notes(keys):
+    for key in keys:
+        shard_indexes[0].remove(key)
+        shard_indexes[1].remove(key)
+
+
+class ShardedSearch:
+    def __init__(self, records, shards):
+        from concurrent.futures import ProcessPoolExecutor, wait
+
+        parts = [[] for _ in range(shards)]
+        for record in records:
+            parts[hash(record.name.value) % shards].append(record)
+        # One single-worker pool per shard, so each process receives its shard once
+        # and then runs its updates and queries in submission order.
+        self.pools = [
+            ProcessPoolExecutor(max_workers=1, initializer=load_shard, initargs=(part,))
+            for part in parts
+        ]
+        wait([pool.submit(int) for pool in self.pools])
+
+    def pool_for(self, name):
+        return self.pools[hash(name) % len(self.pools)]
+
+    def note_changed(self, key, text, tags):
+        self.pool_for(key[0]).submit(update_shard_note, key, text, tags)
+
+    def notes_deleted(self, name, note_ids):
+        keys = [(name, note_id) for note_id in note_ids]
+        if keys:
+            self.pool_for(name).submit(remove_shard_notes, keys)
+
+    def search_text(self, query) -> set[tuple[str, int]]:
+        futures = [pool.submit(search_shard_text, query) for pool in self.pools]
+        keys = set()
+        for future in futures:
+            keys |= future.result()
+        return keys
+
+    def match_tags(self, tags, match_all=True) -> dict[tuple[str, int], int]:
+        futures = [pool.submit(match_shard_tags, tags, match_all) for pool in self.pools]
+        matches = {}
+        for future in futures:
+            matches.update(future.result())
+        return matches
+
+    def close(self):
+        for pool in self.pools:
+            pool.shutdown(cancel_futures=True)
+
+
+class ContactLookup:
+    def who_has(self, value) -> set[str]:
+        names = set(self.lookup("e:" + normalize_email(value)))
+        names |= self.lookup("a:" + normalize_address(value))
+        digits = normalize_phone(value)
+        if digits:
+            names |= self.lookup("p:" + digits)
+        return names
+
+
+class ContactIndex(ContactLookup):
+    def __init__(self):
+        self.values: dict[str, set[str]] = {}
+        self.records: dict[str, set[str]] = {}
+        self.keys: list[tuple[str, str]] = []
+
+    @staticmethod
+    def record_keys(record) -> set[str]:
+        keys = {"n:" + record.name.value.casefold()}
+        keys.update("p:" + normalize_phone(p.value) for p in record.phones)
+        keys.update("e:" + normalize_email(str(e)) for e in record.emails)
+        keys.update("a:" + normalize_address(a.value) for a in record.addresses)
+        return keys
+
+    def build(self, records):
+        for record in records:
+            name = record.name.value
+            self.records[name] = self.record_keys(record)
+            for key in self.records[name]:
+                self.values.setdefault(key, set()).add(name)
+                self.keys.append((key, name))
+        self.keys.sort()
+
+    def update(self, record):
+        name = record.name.value
+        new_keys = self.record_keys(record)
+        old_keys = self.records.get(name, set())
+        for key in old_keys - new_keys:
+            self._unlink(key, name)
+        for key in new_keys - old_keys:
+            self.values.setdefault(key, set()).add(name)
+            insort(self.keys, (key, name))
+        self.records[name] = new_keys
+
+    def remove(self, name):
+        for key in self.records.pop(name, ()):
+            self._unlink(key, name)
+
+    def _unlink(self, key, name):
+        names = self.values[key]
+        names.discard(name)
+        if not names:
+            del self.values[key]
+        del self.keys[bisect_left(self.keys, (key, name))]
+
+    def lookup(self, key) -> set[str]:
+        return self.values.get(key, set())
+
+    def prefix(self, key_prefix, start=0):
+        for i in range(bisect_left(self.keys, (key_prefix,)) + start, len(self.keys)):
+            key, name = self.keys[i]
+            if not key.startswith(key_prefix):
+                return
+            yield name
+
+
+def prefix_bound(prefix):
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class SqliteContactIndex(ContactLookup):
+    FIELD_TABLES = {"p:": "phones", "e:": "emails"}
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.conn = storage.conn
+
+    def _source(self, key):
+        table = self.FIELD_TABLES.get(key[:2])
+        if table is not None:
+            return table, "value", key[2:]
+        return "contact_keys", "key", key
+
+    def lookup(self, key) -> set[str]:
+        self.storage.flush()
+        table, column, value = self._source(key)
+        return {
+            name
+            for (name,) in self.conn.execute(
+                f"SELECT name FROM {table} WHERE {column} = ?", (value,)
+            )
+        }
+
+    def prefix(self, key_prefix, start=0):
+        table, column, value = self._source(key_prefix)
+        bounds, bound_params = f"{column} >= ?", [value]
+        if value:
+            bounds += f" AND {column} < ?"
+            bound_params.append(prefix_bound(value))
+        last = None
+        while True:
+            where, params = bounds, list(bound_params)
+            if last is not None:
+                where += f" AND ({column}, name) > (?, ?)"
+                params.extend(last)
+            self.storage.flush()
+            rows = self.conn.execute(
+                f"SELECT {column}, name FROM {table} WHERE {where} "
+                f"ORDER BY {column}, name LIMIT ? OFFSET ?",
+                (*params, self.storage.BATCH_SIZE, start if last is None else 0),
+            ).fetchall()
+            if not rows:
+                return
+            for _, name in rows:
+                yield name
+            last = rows[-1]
+
+
+def ngrams(text: str) -> set[str]:
+    padded = " " * (NGRAM_SIZE - 1) + text.casefold() + " "
+    return {padded[i : i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            )
+        previous = current
+    return previous[-1]
+
+
+class NameIndex:
+    def __init__(self):
+        self.postings: dict[str, set[str]] = {}
+        self.sizes: dict[str, int] = {}
+
+    def build(self, names):
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        if name in self.sizes:
+            return
+        grams = ngrams(name)
+        self.sizes[name] = len(grams)
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(name)
+
+    def remove(self, name):
+        if self.sizes.pop(name, None) is None:
+            return
+        for gram in ngrams(name):
+            names = self.postings[gram]
+            names.discard(name)
+            if not names:
+                del self.postings[gram]
+
+    def closest(self, query, limit=FUZZY_LIMIT, max_edits=FUZZY_MAX_EDITS):
+        grams = ngrams(query)
+        lists = sorted((self.postings.get(g, set()) for g in grams), key=len)
+        scored = []
+        for edits in range(1, max_edits + 1):
+            # An edit breaks at most NGRAM_SIZE grams, so a match shares at least
+            # `need` of them and must show up in one of the rarest `scan` lists.
+            need = max(len(grams) - NGRAM_SIZE * edits, 1)
+            scan = len(lists) - need + 1
+            counts = Counter()
+            for names in lists[:scan]:
+                counts.update(names)
+            for i in range(scan, len(lists)):
+                left = len(lists) - i - 1
+                hits = lists[i].intersection(counts)
+                counts = {
+                    name: count + (name in hits)
+                    for name, count in counts.items()
+                    if count + (name in hits) + left >= need
+                }
+            scored = [
+                (-shared / (len(grams) + self.sizes[name] - shared), name)
+                for name, shared in counts.items()
+                if shared >= need
+            ]
+            if scored:
+                break
+        best = heapq.nsmallest(limit * FUZZY_RERANK, scored)
+        folded = query.casefold()
+        best.sort(key=lambda item: (edit_distance(folded, item[1].casefold()), item))
+        return [name for _, name in best[:limit]]
+
+
+def calendar_day(day) -> int:
+    return date(LEAP_YEAR, day.month, day.day).timetuple().tm_yday - 1
+
+
+class TagOrderIndex:
+    # Orders are built per contact on first listing, so a SQLite book only
+    # loads the contact being listed.
+    def __init__(self):
+        self.orders: dict[str, list[tuple[str, int]]] = {}
+        self.keys: dict[tuple[str, int], str] = {}
+
+    def build(self, record):
+        name = record.name.value
+        order = []
+        for note in record.notes.values():
+            tag_key = " ".join(note.tags)
+            self.keys[(name, note.id)] = tag_key
+            order.append((tag_key, note.id))
+        order.sort()
+        self.orders[name] = order
+        return order
+
+    def add(self, key, tags):
+        order = self.orders.get(key[0])
+        if order is None:
+            return
+        tag_key = " ".join(tags)
+        if self.keys.get(key) == tag_key:
+            return
+        self.remove(key)
+        self.keys[key] = tag_key
+        insort(order, (tag_key, key[1]))
+
+    def remove(self, key):
+        tag_key = self.keys.pop(key, None)
+        if tag_key is not None:
+            order = self.orders[key[0]]
+            del order[bisect_left(order, (tag_key, key[1]))]
+
+    def forget(self, name):
+        for _, note_id in self.orders.pop(name, ()):
+            self.keys.pop((name, note_id), None)
+
+    def note_ids(self, record, start=0):
+        order = self.orders.get(record.name.value)
+        if order is None:
+            order = self.build(record)
+        for i in range(start, len(order)):
+            yield order[i][1]
+
+
+class TimelineIndex:
+    def __init__(self):
+        self.entries: list[tuple[int, str, int]] = []
+        self.stamps: dict[tuple[str, int], int] = {}
+
+    def build(self, records):
+        for record in records:
+            for note in record.notes.values():
+                self.stamps[(record.name.value, note.id)] = note.updated_us
+        self.entries = sorted((stamp, name, note_id) for (name, note_id), stamp in self.stamps.items())
+
+    def add(self, key, stamp):
+        if self.stamps.get(key) == stamp:
+            return
+        self.remove(key)
+        self.stamps[key] = stamp
+        insort(self.entries, (stamp, *key))
+
+    def remove(self, key):
+        stamp = self.stamps.pop(key, None)
+        if stamp is not None:
+            del self.entries[bisect_left(self.entries, (stamp, *key))]
+
+    def between(self, start, end):
+        first = bisect_left(self.entries, (start,))
+        last = bisect_left(self.entries, (end,), first)
+        for i in range(last - 1, first - 1, -1):
+            _, name, note_id = self.entries[i]
+            yield name, note_id
+
+
+class SqliteTimelineIndex:
+    def __init__(self, storage):
+        self.storage = storage
+        self.conn = storage.conn
+
+    def between(self, start, end):
+        bounds = [from_micros(start).isoformat(), from_micros(end).isoformat()]
+        last = None
+        while True:
+            where, params = "updated_at >= ? AND updated_at < ?", list(bounds)
+            if last is not None:
+                where += " AND (updated_at, name, id) < (?, ?, ?)"
+                params.extend(last)
+            self.storage.flush()
+            rows = self.conn.execute(
+                f"SELECT updated_at, name, id FROM notes WHERE {where} "
+                f"ORDER BY updated_at DESC, name DESC, id DESC LIMIT ?",
+                (*params, self.storage.BATCH_SIZE),
+            ).fetchall()
+            if not rows:
+                return
+            for _, name, note_id in rows:
+                yield name, note_id
+            last = rows[-1]
+
+
+class BirthdayLookup:
+    def upcoming(self, today, days):
+        import calendar
+
+        for offset in range(min(days, 365) + 1):
+            day = today + timedelta(days=offset)
+            names = self.born_on(day)
+            if day.month == 2 and day.day == 28 and not calendar.isleap(day.year):
+                names = names | self.born_on(date(LEAP_YEAR, 2, 29))
+            for name in sorted(names):
+                yield name, day
+
+
+class BirthdayIndex(BirthdayLookup):
+    def __init__(self):
+        self.buckets: list[set[str]] = [set() for _ in range(366)]
+        self.days: dict[str, int] = {}
+
+    def add(self, name, birthday):
+        self.remove(name)
+        if birthday is None:
+            return
+        day = calendar_day(birthday)
+        self.buckets[day].add(name)
+        self.days[name] = day
+
+    def remove(self, name):
+        day = self.days.pop(name, None)
+        if day is not None:
+            self.buckets[day].discard(name)
+
+    def born_on(self, day) -> set[str]:
+        return self.buckets[calendar_day(day)]
+
+    def count(self) -> int:
+        return len(self.days)
+
+    def names(self, start=0):
+        for bucket in self.buckets:
+            if start >= len(bucket):
+                start -= len(bucket)
+                continue
+            yield from sorted(bucket)[start:]
+            start = 0
+
+
+class SqliteBirthdayIndex(BirthdayLookup):
+    # Birthdays are stored as DD.MM.YYYY; MMDD sorts in calendar order and
+    # matches the records_birthday_day expression index.
+    DAY = "substr(birthday, 4, 2) || substr(birthday, 1, 2)"
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.conn = storage.conn
+
+    def born_on(self, day) -> set[str]:
+        self.storage.flush()
+        return {
+            name
+            for (name,) in self.conn.execute(
+                f"SELECT name FROM records WHERE {self.DAY} = ?",
+                (f"{day.month:02d}{day.day:02d}",),
+            )
+        }
+
+    def count(self) -> int:
+        self.storage.flush()
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM records WHERE birthday IS NOT NULL"
+        ).fetchone()[0]
+
+    def names(self, start=0):
+        last = None
+        while True:
+            where, params = "birthday IS NOT NULL", []
+            if last is not None:
+                where += f" AND ({self.DAY}, name) > (?, ?)"
+                params.extend(last)
+            self.storage.flush()
+            rows = self.conn.execute(
+                f"SELECT {self.DAY}, name FROM records WHERE {where} "
+                f"ORDER BY {self.DAY}, name LIMIT ? OFFSET ?",
+                (*params, self.storage.BATCH_SIZE, start if last is None else 0),
+            ).fetchall()
+            if not rows:
+                return
+            for _, name in rows:
+                yield name
+            last = rows[-1]
+
+
 class Field:
+    __slots__ = ("_value",)
+
     def __init__(self, value):
         self.value = value
 
+    def __getstate__(self):
+        return {"_value": self._value}
+
+    def __setstate__(self, state):
+        self._value = state["_value"]
+
     @property
     def value(self):
         return self._value
@@ -171,13 +1213,15 @@ class Field:
 
 
 class Name(Field):
-    pass
+    __slots__ = ()
 
 
 class Email(Field):
+    __slots__ = ()
+
     @Field.value.setter
     def value(self, new_value):
-        if not re.fullmatch(r'^[a-z0-9]+[\._]?[a-z0-9]+[@]\w+[.]\w+$', new_value):
+        if not is_valid_email(new_value):
             raise EmailValidationError(
                 "ℹ️  The email must be in propper format.\n"
             )
@@ -185,29 +1229,36 @@ class Email(Field):
 
 
 class Phone(Field):
+    __slots__ = ()
+
     @Field.value.setter
     def value(self, new_value):
-        if not re.fullmatch(r"^\d{10}$", new_value):
+        if not is_valid_phone(new_value):
             raise PhoneValidationError(
                 "ℹ️  The phone number must consist of exactly 10 digits.\n"
             )
         self._value = new_value
 
 class Address(Field):
+    __slots__ = ()
+
     def __init__(self, value):
         self._value = value
+
     @Field.value.setter
     def value(self, new_value):
-        if not re.fullmatch(r".{5,}", new_value):
+        if not is_valid_address(new_value):
             raise AddressValidationError(
                 "ℹ️  The address is invalid. Minimum 5 characters is required\n"
             )
         self._value = new_value
 
 class Birthday(Field):
+    __slots__ = ()
+
     def __init__(self, value):
         try:
-            self._value = datetime.strptime(value, "%d.%m.%Y").date()
+            self._value = parse_birthday(value)
         except ValueError:
             raise DateValidationError("⚠️  Invalid date format. Use DD.MM.YYYY\n")
 
@@ -220,59 +1271,132 @@ class Birthday(Field):
 
 
 class Note:
+    __slots__ = ("id", "text", "tags", "created_us", "updated_us", "owner")
+
     def __init__(self, note_id: int, text: str, tags: list[str] | None = None):
         self.id = note_id
         self.text = text
-        self.tags: list[str] = normalize_tags(tags or [])
-        self.created_at = datetime.now()
-        self.updated_at = self.created_at
+        self.tags: tuple[str, ...] = tuple(normalize_tags(tags or []))
+        self.created_us = to_micros(datetime.now())
+        self.updated_us = self.created_us
+        self.owner = None
+
+    def __getstate__(self):
+        return {
+            "version": SCHEMA_VERSION,
+            "id": self.id,
+            "text": self.text,
+            "tags": self.tags,
+            "created_us": self.created_us,
+            "updated_us": self.updated_us,
+        }
+
+    def __setstate__(self, state):
+        state = migrate_note_state(state)
+        self.id = state["id"]
+        self.text = state["text"]
+        self.tags = tuple(sys.intern(t) for t in state["tags"])
+        self.created_us = state["created_us"]
+        self.updated_us = state["updated_us"]
+        self.owner = None
+
+    @property
+    def created_at(self) -> datetime:
+        return from_micros(self.created_us)
+
+    @created_at.setter
+    def created_at(self, moment: datetime):
+        self.created_us = to_micros(moment)
+
+    @property
+    def updated_at(self) -> datetime:
+        return from_micros(self.updated_us)
+
+    @updated_at.setter
+    def updated_at(self, moment: datetime):
+        self.updated_us = to_micros(moment)
+
+    def touch(self):
+        self.updated_us = to_micros(datetime.now())
+        if self.owner is not None:
+            self.owner.note_changed(self)
 
     def update_text(self, new_text: str):
         self.text = new_text
-        self.updated_at = datetime.now()
+        self.touch()
 
     def add_tags(self, tags: list[str]):
-        ensure_note_has_tags(self)
-        to_add = normalize_tags(tags)
         existing = set(self.tags)
-        for t in to_add:
-            if t not in existing:
-                self.tags.append(t)
-                existing.add(t)
-        self.updated_at = datetime.now()
+        self.tags += tuple(t for t in normalize_tags(tags) if t not in existing)
+        self.touch()
 
     def remove_tags(self, tags: list[str]):
-        ensure_note_has_tags(self)
         to_remove = set(normalize_tags(tags))
         if not self.tags:
             return
-        self.tags = [t for t in self.tags if t not in to_remove]
-        self.updated_at = datetime.now()
+        self.tags = tuple(t for t in self.tags if t not in to_remove)
+        self.touch()
 
     def clear_tags(self):
-        ensure_note_has_tags(self)
-        self.tags = []
-        self.updated_at = datetime.now()
+        self.tags = ()
+        self.touch()
 
     def __str__(self):
-        ensure_note_has_tags(self)
         tags_str = f" [#{', #'.join(self.tags)}]" if self.tags else ""
         return f"[{self.id}] {self.text}{tags_str}"
 
 
 class Record:
+    __slots__ = (
+        "name", "addresses", "phones", "emails", "birthday", "notes",
+        "next_note_id", "book",
+    )
+
     def __init__(self, name):
         self.name = Name(name)
         self.addresses = []
         self.phones = []
         self.emails = []
         self.birthday = None
-        self.notes: list[Note] = []
+        self.notes: dict[int, Note] = {}
         self.next_note_id = 1
+        self.book = None
+
+    def __getstate__(self):
+        return {
+            "version": SCHEMA_VERSION,
+            "name": self.name,
+            "addresses": self.addresses,
+            "phones": self.phones,
+            "emails": self.emails,
+            "birthday": self.birthday,
+            "notes": self.notes,
+            "next_note_id": self.next_note_id,
+        }
+
+    def __setstate__(self, state):
+        state = migrate_record_state(state)
+        self.name = state["name"]
+        self.addresses = state["addresses"]
+        self.phones = state["phones"]
+        self.emails = state["emails"]
+        self.birthday = state["birthday"]
+        self.notes = state["notes"]
+        self.next_note_id = state["next_note_id"]
+        self.book = None
+
+    def changed(self):
+        if self.book is not None:
+            self.book.record_changed(self)
+
+    def note_changed(self, note):
+        if self.book is not None:
+            self.book.note_changed(self, note)
 
     def add_birthday(self, birthday: str):
         try:
             self.birthday = Birthday(birthday)
+            self.changed()
             return f"✅ Birthday {birthday} added for contact {self.name.value}.\n"
         except DateValidationError as e:
             return str(e)
@@ -280,19 +1404,27 @@ class Record:
     def add_phone(self, phone_number: str):
         try:
             phone = Phone(phone_number)
-            if phone.value not in [p.value for p in self.phones]:
+            if not self.has_phone(phone.value):
                 self.phones.append(phone)
+                self.changed()
                 return f"✅ Phone {phone_number} added to contact {self.name.value}.\n"
             else:
                 return f"ℹ️  The number {phone_number} already exists for contact {self.name.value}.\n"
         except PhoneValidationError as e:
             return str(e)
 
+    def has_phone(self, phone_number: str) -> bool:
+        if self.book is not None and self.book.contact_index is not None:
+            key = "p:" + normalize_phone(phone_number)
+            return self.name.value in self.book.contact_index.lookup(key)
+        return any(p.value == phone_number for p in self.phones)
+
     def add_address(self, address: str):
         try:
             addr = Address(address)
             if addr.value not in [a.value for a in self.addresses]:
                 self.addresses.append(addr)
+                self.changed()
                 return f"✅ Address {address} added to contact {self.name.value}.\n"
             else:
                 return f"ℹ️  The address {address} already exists for contact {self.name.value}.\n"
@@ -302,8 +1434,9 @@ class Record:
     def add_email(self, email: str):
         try:
             email_value = Email(email)
-            if email_value.value not in [p.value for p in self.emails]:
+            if email_value.value not in [str(e) for e in self.emails]:
                 self.emails.append(email)
+                self.changed()
                 return f"✅ Email {email} added to contact {self.name.value}.\n"
             else:
                 return f"ℹ️  The email {email} already exists for contact {self.name.value}.\n"
@@ -315,12 +1448,14 @@ class Record:
         if not phone_obj:
             return f"⚠️  Phone {old} not found for {self.name.value}.\n"
         phone_obj.value = new
+        self.changed()
         return f"✅ Phone {old} updated to {new}.\n"
 
     def remove_phone(self, phone_number):
         phone_obj = next((p for p in self.phones if p.value == phone_number), None)
         if phone_obj:
             self.phones.remove(phone_obj)
+            self.changed()
             return f"✅ Phone {phone_number} deleted for contact {self.name.value}.\n"
         else:
             return (
@@ -332,52 +1467,64 @@ class Record:
         if not text:
             return "Note text cannot be empty."
         note = Note(self.next_note_id, text, tags or [])
-        self.notes.append(note)
+        note.owner = self
+        self.notes[note.id] = note
         self.next_note_id += 1
+        self.note_changed(note)
         if note.tags:
             return f"✅ Note [{note.id}] added for contact {self.name.value} with tags: {', '.join('#' + t for t in note.tags)}."
         return f"Note [{note.id}] added for contact {self.name.value}."
 
     def list_notes(self) -> list[Note]:
-        return list(self.notes)
+        return list(self.notes.values())
 
     def find_note(self, note_id: int) -> Note | None:
-        for n in self.notes:
-            if n.id == note_id:
-                return n
-        return None
+        return self.notes.get(note_id)
 
     def search_notes(self, query: str) -> list[Note]:
-        q = query.strip().lower()
-        if not q:
+        words = set(tokenize(query))
+        if not words:
             return []
-        return [n for n in self.notes if q in n.text.lower()]
+        name = self.name.value
+        index = self.book.text_index if self.book is not None else None
+        docs = index.docs if isinstance(index, TextIndex) else None
+        results = []
+        for n in self.notes.values():
+            tokens = docs[(name, n.id)] if docs is not None else tokenize(n.text)
+            if all(any(t.startswith(w) for t in tokens) for w in words):
+                results.append(n)
+        return results
 
     def search_notes_by_tags(
         self, tags: list[str], match_all: bool = True
     ) -> list[tuple[Note, int]]:
-        query_tags = set(normalize_tags(tags))
+        query_tags = normalize_tags(tags)
         if not query_tags:
             return []
-        results: list[tuple[Note, int]] = []
-        for n in self.notes:
-            ensure_note_has_tags(n)
-            note_tags = set(n.tags)
-            match_count = len(query_tags & note_tags)
-            if (match_all and query_tags.issubset(note_tags)) or (
-                not match_all and match_count > 0
-            ):
-                results.append((n, match_count))
-
+        name = self.name.value
+        if self.book is not None:
+            index = self.book.ensure_tag_index()
+        else:
+            index = TagIndex()
+            for n in self.notes.values():
+                index.add((name, n.id), n.tags)
+        matches = index.match(query_tags, match_all=match_all, name=name)
+        results = [(self.find_note(note_id), count) for (_, note_id), count in matches.items()]
         results.sort(
-            key=lambda item: (-item[1], -item[0].updated_at.timestamp(), item[0].id)
+            key=lambda item: (-item[1], -item[0].updated_us, item[0].id)
         )
         return results
 
+    def iter_notes_by_tags(self, start: int = 0):
+        if self.book is None:
+            ordered = sorted(self.notes.values(), key=lambda n: (" ".join(n.tags), n.id))
+            yield from ordered[start:]
+            return
+        for note_id in self.book.ensure_tag_order_index().note_ids(self, start):
+            yield self.notes[note_id]
+
     def list_notes_sorted_by_tags(self) -> list[Note]:
-        for n in self.notes:
-            ensure_note_has_tags(n)
-        return sorted(self.notes, key=lambda n: (" ".join(n.tags), n.id))
+        return list(self.iter_notes_by_tags())
 
     def edit_note(self, note_id: int, new_text: str):
         note = self.find_note(note_id)
@@ -397,7 +1544,10 @@ class Record:
             raise NoteNotFoundError(
                 f"Note [{note_id}] not found for contact {self.name.value}."
             )
-        self.notes.remove(note)
+        del self.notes[note_id]
+        note.owner = None
+        if self.book is not None:
+            self.book.note_deleted(self, note)
         return f"Note [{note_id}] deleted for contact {self.name.value}."
 
     def __str__(self):
@@ -414,8 +1564,190 @@ class Record:
 
 
 class AddressBook(UserDict):
+    storage = None
+    text_index = None
+    rank_index = None
+    tag_index = None
+    birthday_index = None
+    timeline_index = None
+    tag_order_index = None
+    contact_index = None
+    name_index = None
+    autosaver = None
+    shard_count = 0
+    shard_search = None
+    shard_lock = threading.Lock()
+    schema_version = 0
+    changes = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("storage", None)
+        state.pop("autosaver", None)
+        state.pop("changes", None)
+        state.pop("shard_count", None)
+        state.pop("shard_search", None)
+        state["schema_version"] = SCHEMA_VERSION
+        return state
+
+    @contextmanager
+    def batch(self):
+        with self.storage.batch() if self.storage is not None else nullcontext():
+            yield
+
+    def drop_indexes(self):
+        self.text_index = None
+        self.rank_index = None
+        self.tag_index = None
+        self.birthday_index = None
+        self.timeline_index = None
+        self.tag_order_index = None
+        self.contact_index = None
+        self.name_index = None
+        if self.shard_search is not None:
+            self.shard_search.close()
+            self.shard_search = None
+
+    def attach(self):
+        for record in self.data.values():
+            record.book = self
+            for note in record.notes.values():
+                note.owner = record
+
+    def record_changed(self, record):
+        if isinstance(self.contact_index, ContactIndex):
+            self.contact_index.update(record)
+        if self.name_index is not None:
+            self.name_index.add(record.name.value)
+        if isinstance(self.birthday_index, BirthdayIndex):
+            self.birthday_index.add(
+                record.name.value, record.birthday.value if record.birthday else None
+            )
+        self.changes += 1
+        if self.storage is not None:
+            self.storage.record_changed(record)
+
+    def note_changed(self, record, note):
+        if isinstance(self.text_index, TextIndex):
+            self.text_index.add((record.name.value, note.id), note.text)
+        if isinstance(self.rank_index, RankIndex):
+            self.rank_index.add((record.name.value, note.id), note_terms(note))
+        if isinstance(self.timeline_index, TimelineIndex):
+            self.timeline_index.add((record.name.value, note.id), note.updated_us)
+        if self.tag_order_index is not None:
+            self.tag_order_index.add((record.name.value, note.id), note.tags)
+        if isinstance(self.tag_index, TagIndex):
+            self.tag_index.add((record.name.value, note.id), note.tags)
+        if self.shard_search is not None:
+            self.shard_search.note_changed((record.name.value, note.id), note.text, note.tags)
+        self.changes += 1
+        if self.storage is not None:
+            self.storage.note_changed(record, note)
+
+    def note_deleted(self, record, note):
+        if isinstance(self.text_index, TextIndex):
+            self.text_index.remove((record.name.value, note.id))
+        if isinstance(self.rank_index, RankIndex):
+            self.rank_index.remove((record.name.value, note.id))
+        if isinstance(self.timeline_index, TimelineIndex):
+            self.timeline_index.remove((record.name.value, note.id))
+        if self.tag_order_index is not None:
+            self.tag_order_index.remove((record.name.value, note.id))
+        if isinstance(self.tag_index, TagIndex):
+            self.tag_index.remove((record.name.value, note.id))
+        if self.shard_search is not None:
+            self.shard_search.notes_deleted(record.name.value, [note.id])
+        self.changes += 1
+        if self.storage is not None:
+            self.storage.note_deleted(record, note)
+
+    def ensure_text_index(self) -> TextIndex | SqliteTextIndex:
+        if self.text_index is None:
+            if isinstance(self.storage, SqliteStorage):
+                self.text_index = SqliteTextIndex(self.storage)
+            else:
+                index = TextIndex()
+                index.build(self.data.values())
+                self.text_index = index
+        return self.text_index
+
+    def ensure_rank_index(self) -> Bm25:
+        if self.rank_index is None:
+            if isinstance(self.storage, SqliteStorage):
+                self.rank_index = SqliteRankIndex(self.storage)
+            else:
+                index = RankIndex()
+                index.build(self.data.values())
+                self.rank_index = index
+        return self.rank_index
+
+    def ensure_shard_search(self) -> ShardedSearch:
+        with self.shard_lock:
+            if self.shard_search is None:
+                self.shard_search = ShardedSearch(self.data.values(), self.shard_count)
+            return self.shard_search
+
+    def ensure_tag_index(self) -> TagIndex | SqliteTagIndex:
+        if self.tag_index is None:
+            if isinstance(self.storage, SqliteStorage):
+                self.tag_index = SqliteTagIndex(self.storage)
+            else:
+                index = TagIndex()
+                index.build(self.data.values())
+                self.tag_index = index
+        return self.tag_index
+
+    def ensure_contact_index(self) -> ContactLookup:
+        if self.contact_index is None:
+            if isinstance(self.storage, SqliteStorage):
+                self.contact_index = SqliteContactIndex(self.storage)
+            else:
+                index = ContactIndex()
+                index.build(self.data.values())
+                self.contact_index = index
+        return self.contact_index
+
+    def ensure_name_index(self) -> NameIndex:
+        if self.name_index is None:
+            index = NameIndex()
+            index.build(self.data.keys())
+            self.name_index = index
+        return self.name_index
+
+    def ensure_tag_order_index(self) -> TagOrderIndex:
+        if self.tag_order_index is None:
+            self.tag_order_index = TagOrderIndex()
+        return self.tag_order_index
+
+    def ensure_timeline_index(self) -> TimelineIndex | SqliteTimelineIndex:
+        if self.timeline_index is None:
+            if isinstance(self.storage, SqliteStorage):
+                self.timeline_index = SqliteTimelineIndex(self.storage)
+            else:
+                index = TimelineIndex()
+                index.build(self.data.values())
+                self.timeline_index = index
+        return self.timeline_index
+
+    def ensure_birthday_index(self) -> BirthdayLookup:
+        if self.birthday_index is None:
+            if isinstance(self.storage, SqliteStorage):
+                self.birthday_index = SqliteBirthdayIndex(self.storage)
+            else:
+                index = BirthdayIndex()
+                for record in self.data.values():
+                    if record.birthday is not None:
+                        index.add(record.name.value, record.birthday.value)
+                self.birthday_index = index
+        return self.birthday_index
+
     def add_record(self, record):
+        record.book = self
         self.data[record.name.value] = record
+        self.record_changed(record)
+        for note in record.notes.values():
+            note.owner = record
+            self.note_changed(record, note)
         return f"✅ Record for contact {record.name.value} added.\n"
 
     def find(self, name):
@@ -423,74 +1755,881 @@ class AddressBook(UserDict):
 
     def delete(self, name):
         if name in self.data:
-            del self.data[name]
+            record = self.data.pop(name)
+            record.book = None
+            if isinstance(self.contact_index, ContactIndex):
+                self.contact_index.remove(name)
+            if self.name_index is not None:
+                self.name_index.remove(name)
+            if isinstance(self.birthday_index, BirthdayIndex):
+                self.birthday_index.remove(name)
+            if self.tag_order_index is not None:
+                self.tag_order_index.forget(name)
+            for note in record.notes.values():
+                if isinstance(self.text_index, TextIndex):
+                    self.text_index.remove((name, note.id))
+                if isinstance(self.rank_index, RankIndex):
+                    self.rank_index.remove((name, note.id))
+                if isinstance(self.timeline_index, TimelineIndex):
+                    self.timeline_index.remove((name, note.id))
+                if isinstance(self.tag_index, TagIndex):
+                    self.tag_index.remove((name, note.id))
+            if self.shard_search is not None:
+                self.shard_search.notes_deleted(name, list(record.notes))
+            self.changes += 1
+            if self.storage is not None:
+                self.storage.record_deleted(name)
             return f"✅ Record for contact {name} deleted.\n"
         else:
             raise RecordNotFoundError(f"ℹ️  Record with name {name} not found.\n")
 
     def search_notes_global(self, query: str):
-        q = query.strip()
-        if not q:
+        if not query.strip():
             return []
+        if self.shard_count:
+            keys = self.ensure_shard_search().search_text(query)
+        else:
+            keys = self.ensure_text_index().search(query)
+        keys = sorted(keys, key=lambda key: (key[0].lower(), key[1]))
         results = []
-        for record in self.data.values():
-            for note in record.search_notes(q):
-                results.append(
-                    {"name": record.name.value, "note_id": note.id, "text": note.text}
-                )
+        for name, note_id in keys:
+            note = self.data[name].find_note(note_id)
+            results.append({"name": name, "note_id": note_id, "text": note.text})
         return results
 
-    def search_notes_by_tags_global(self, tags: list[str], match_all: bool = True):
-        query_tags = normalize_tags(tags)
-        if not query_tags:
-            return []
+    def notes_between(self, start: datetime, end: datetime, limit: int = TIMELINE_LIMIT):
+        keys = self.ensure_timeline_index().between(to_micros(start), to_micros(end))
+        return [
+            self.data[name].find_note(note_id) for name, note_id in islice(keys, limit)
+        ]
+
+    def rank_notes(self, query: str, limit: int = RANK_LIMIT):
         results = []
-        for record in self.data.values():
-            matches = record.search_notes_by_tags(query_tags, match_all=match_all)
-            for note, match_count in matches:
-                ensure_note_has_tags(note)
-                results.append(
-                    {
-                        "name": record.name.value,
-                        "note_id": note.id,
-                        "text": note.text,
-                        "tags": list(note.tags),
-                        "matches": match_count,
-                    }
-                )
-
-        results.sort(key=lambda x: (-x["matches"], x["name"].lower(), x["note_id"]))
+        for (name, note_id), score in self.ensure_rank_index().search(query, limit):
+            note = self.data[name].find_note(note_id)
+            results.append(
+                {
+                    "name": name,
+                    "note_id": note_id,
+                    "text": note.text,
+                    "tags": list(note.tags),
+                    "score": score,
+                }
+            )
         return results
 
+    def search_notes_by_tags_global(
+        self, tags: list[str], match_all: bool = True, limit: int | None = None
+    ):
+        query_tags = normalize_tags(tags)
+        if not query_tags:
+            return []
+        if self.shard_count:
+            matches = self.ensure_shard_search().match_tags(query_tags, match_all)
+        else:
+            matches = self.ensure_tag_index().match(query_tags, match_all=match_all)
+        ranked = []
+        for (name, note_id), count in matches.items():
+            note = self.data[name].find_note(note_id)
+            ranked.append(
+                (-count, -note.updated_us, name.lower(), note_id, name, note)
+            )
+        top = heapq.nsmallest(limit if limit is not None else len(ranked), ranked)
+        return [
+            {
+                "name": name,
+                "note_id": note.id,
+                "text": note.text,
+                "tags": list(note.tags),
+                "matches": -neg_count,
+            }
+            for neg_count, _, _, _, name, note in top
+        ]
+
+
+    def count_records(self, sort=None) -> int:
+        if sort == "birthday":
+            return self.ensure_birthday_index().count()
+        return len(self.data)
+
+    def iter_records(self, sort=None, start=0):
+        if sort == "name":
+            for name in self.ensure_contact_index().prefix("n:", start):
+                yield self.data[name]
+        elif sort == "birthday":
+            for name in self.ensure_birthday_index().names(start):
+                yield self.data[name]
+        elif sort == "notes":
+            records = sorted(
+                self.data.values(),
+                key=lambda r: (-len(r.notes), r.name.value.casefold()),
+            )
+            yield from islice(records, start, None)
+        elif isinstance(self.data, LazyRecords):
+            yield from self.data.values(start)
+        else:
+            yield from islice(self.data.values(), start, None)
 
-    def get_upcoming_birthdays(self):
+    def get_upcoming_birthdays(self, days: int = 7):
         upcoming_birthdays = []
+        seen = set()
         today = datetime.now().date()
-        next_week = today + timedelta(days=7)
 
-        for record in self.data.values():
-            if record.birthday is None:
+        for name, bday_this_year in self.ensure_birthday_index().upcoming(today, days):
+            if name in seen:
                 continue
+            seen.add(name)
 
-            bday_date = record.birthday.value
-            bday_this_year = bday_date.replace(year=today.year)
+            if bday_this_year.weekday() >= 5:
+                days_until_monday = 7 - bday_this_year.weekday()
+                bday_this_year += timedelta(days=days_until_monday)
 
-            if bday_this_year < today:
-                bday_this_year = bday_date.replace(year=today.year + 1)
+            upcoming_birthdays.append(
+                {
+                    "name": name,
+                    "congratulation_date": bday_this_year.strftime("%d.%m.%Y"),
+                }
+            )
 
-            if today <= bday_this_year <= next_week:
-                if bday_this_year.weekday() >= 5:
-                    days_until_monday = 7 - bday_this_year.weekday()
-                    bday_this_year += timedelta(days=days_until_monday)
+        return upcoming_birthdays
 
-                upcoming_birthdays.append(
-                    {
-                        "name": record.name.value,
-                        "congratulation_date": bday_this_year.strftime("%d.%m.%Y"),
-                    }
-                )
 
-        return upcoming_birthdays
+class Journal:
+    def __init__(self, snapshot_path, compact_every=JOURNAL_COMPACT_EVERY):
+        self.snapshot_path = snapshot_path
+        self.path = snapshot_path + ".journal"
+        self.rotated_path = self.path + ".1"
+        self.compact_every = compact_every
+        self.entries = 0
+        self.batch_depth = 0
+        self._file = None
+        self._compactor = None
+
+    def open(self):
+        self._file = open(self.path, "a", encoding="utf-8")
+        if os.path.exists(self.rotated_path):
+            self._start_compactor()
+        elif self.entries >= self.compact_every:
+            self.compact()
+
+    def write(self, entry):
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.entries += 1
+        if not self.batch_depth:
+            self._file.flush()
+            if self.entries >= self.compact_every:
+                self.compact()
+
+    @contextmanager
+    def batch(self):
+        self.batch_depth += 1
+        try:
+            yield
+        finally:
+            self.batch_depth -= 1
+            self._file.flush()
+            if not self.batch_depth and self.entries >= self.compact_every:
+                self.compact()
+
+    def sync(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self.sync()
+        if self._compactor is not None:
+            self._compactor.join()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def record_changed(self, record):
+        self.write(
+            {
+                "op": "record",
+                "name": record.name.value,
+                "phones": [p.value for p in record.phones],
+                "emails": [str(e) for e in record.emails],
+                "addresses": [a.value for a in record.addresses],
+                "birthday": str(record.birthday) if record.birthday else None,
+                "next_note_id": record.next_note_id,
+            }
+        )
+
+    def record_deleted(self, name):
+        self.write({"op": "delete", "name": name})
+
+    def note_changed(self, record, note):
+        self.write(
+            {
+                "op": "note",
+                "name": record.name.value,
+                "id": note.id,
+                "text": note.text,
+                "tags": list(note.tags),
+                "created_at": note.created_at.isoformat(),
+                "updated_at": note.updated_at.isoformat(),
+            }
+        )
+
+    def note_deleted(self, record, note):
+        self.write({"op": "note-delete", "name": record.name.value, "id": note.id})
+
+    def replay(self, book):
+        self._replay_file(book, self.rotated_path)
+        self.entries = self._replay_file(book, self.path)
+
+    def compact(self):
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        if not os.path.exists(self.rotated_path):
+            self._file.close()
+            os.replace(self.path, self.rotated_path)
+            self._file = open(self.path, "a", encoding="utf-8")
+            self.entries = 0
+        self._start_compactor()
+
+    def _start_compactor(self):
+        self._compactor = threading.Thread(target=self._write_snapshot)
+        self._compactor.start()
+
+    def _write_snapshot(self):
+        book = read_snapshot(self.snapshot_path)
+        book.ensure_rank_index()
+        self._replay_file(book, self.rotated_path)
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(book, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        # The rename must be durable before the rotated journal is removed.
+        fsync_dir(self.snapshot_path)
+        os.remove(self.rotated_path)
+
+    @staticmethod
+    def _replay_file(book, path):
+        count = 0
+        end = 0
+        try:
+            with open(path, "rb+") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("torn journal line")
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Cut the torn tail off, or entries appended after it
+                        # would be skipped on every later replay.
+                        f.truncate(end)
+                        break
+                    Journal.apply(book, entry)
+                    count += 1
+                    end += len(line)
+        except FileNotFoundError:
+            pass
+        return count
+
+    @staticmethod
+    def apply(book, entry):
+        op = entry["op"]
+        name = entry["name"]
+        if op == "delete":
+            if name in book.data:
+                book.delete(name)
+            return
+
+        record = book.find(name)
+        if record is None:
+            if op == "note-delete":
+                return
+            record = Record(name)
+            record.book = book
+            book.data[name] = record
+
+        if op == "record":
+            record.phones = [Phone(v) for v in entry["phones"]]
+            record.emails = list(entry["emails"])
+            record.addresses = [Address(v) for v in entry["addresses"]]
+            record.birthday = Birthday(entry["birthday"]) if entry["birthday"] else None
+            record.next_note_id = max(record.next_note_id, entry["next_note_id"])
+            book.record_changed(record)
+        elif op == "note":
+            note = record.find_note(entry["id"])
+            if note is None:
+                note = Note(entry["id"], entry["text"])
+                note.owner = record
+                record.notes[note.id] = note
+            note.text = entry["text"]
+            note.tags = tuple(sys.intern(t) for t in entry["tags"])
+            note.created_at = datetime.fromisoformat(entry["created_at"])
+            note.updated_at = datetime.fromisoformat(entry["updated_at"])
+            record.next_note_id = max(record.next_note_id, note.id + 1)
+            book.note_changed(record, note)
+        elif op == "note-delete":
+            note = record.find_note(entry["id"])
+            if note is not None:
+                del record.notes[note.id]
+                note.owner = None
+                book.note_deleted(record, note)
+
+
+class SqliteStorage:
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS records (
+            name TEXT PRIMARY KEY,
+            birthday TEXT,
+            next_note_id INTEGER NOT NULL DEFAULT 1
+        );
+        CREATE INDEX IF NOT EXISTS records_birthday_day
+            ON records (substr(birthday, 4, 2) || substr(birthday, 1, 2), name);
+        CREATE TABLE IF NOT EXISTS phones (name TEXT NOT NULL, value TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS phones_name ON phones (name);
+        CREATE INDEX IF NOT EXISTS phones_value ON phones (value);
+        CREATE TABLE IF NOT EXISTS emails (name TEXT NOT NULL, value TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS emails_name ON emails (name);
+        CREATE INDEX IF NOT EXISTS emails_value ON emails (value);
+        CREATE TABLE IF NOT EXISTS addresses (name TEXT NOT NULL, value TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS addresses_name ON addresses (name);
+        CREATE TABLE IF NOT EXISTS contact_keys (key TEXT NOT NULL, name TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS contact_keys_key ON contact_keys (key, name);
+        CREATE INDEX IF NOT EXISTS contact_keys_name ON contact_keys (name);
+        CREATE TABLE IF NOT EXISTS notes (
+            name TEXT NOT NULL,
+            id INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (name, id)
+        );
+        CREATE INDEX IF NOT EXISTS notes_updated ON notes (updated_at);
+        CREATE TABLE IF NOT EXISTS tags (
+            name TEXT NOT NULL,
+            note_id INTEGER NOT NULL,
+            tag TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS tags_note ON tags (name, note_id);
+        CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag);
+        CREATE TABLE IF NOT EXISTS terms (
+            term TEXT NOT NULL,
+            name TEXT NOT NULL,
+            note_id INTEGER NOT NULL,
+            tf INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS terms_term ON terms (term);
+        CREATE INDEX IF NOT EXISTS terms_note ON terms (name, note_id);
+        CREATE TABLE IF NOT EXISTS note_lengths (
+            name TEXT NOT NULL,
+            note_id INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            PRIMARY KEY (name, note_id)
+        );
+    """
+    BATCH_SIZE = 500
+
+    def __init__(self, path):
+        self.path = path
+        self.batch_depth = 0
+        self.dirty = {}
+        self.dirty_notes = {}
+        self.deleted = set()
+        # Server readers flush too, so the dirty maps are only drained under this lock.
+        self.flush_lock = threading.Lock()
+        import sqlite3
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self._backfill_terms()
+        self._backfill_contact_keys()
+
+    def _backfill_terms(self):
+        notes = self.conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+        indexed = self.conn.execute("SELECT COUNT(*) FROM note_lengths").fetchone()[0]
+        if notes == indexed:
+            return
+        with self.conn:
+            self.conn.execute("DELETE FROM terms")
+            self.conn.execute("DELETE FROM note_lengths")
+            for names in self.iter_names():
+                for record in self.load_records(names).values():
+                    for note in record.notes.values():
+                        self._write_terms(record.name.value, note)
+
+    def _backfill_contact_keys(self):
+        records = self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        keyed = self.conn.execute(
+            "SELECT COUNT(*) FROM contact_keys WHERE key >= 'n:' AND key < 'n;'"
+        ).fetchone()[0]
+        if records == keyed:
+            return
+        with self.conn:
+            self.conn.execute("DELETE FROM contact_keys")
+            for names in self.iter_names():
+                for record in self.load_records(names).values():
+                    self._write_contact_keys(record)
+
+    def _write_contact_keys(self, record):
+        # Phones and emails are looked up in their own tables; names and
+        # addresses are stored folded here because lookups are case-insensitive.
+        name = record.name.value
+        self.conn.execute("DELETE FROM contact_keys WHERE name = ?", (name,))
+        self.conn.executemany(
+            "INSERT INTO contact_keys (key, name) VALUES (?, ?)",
+            [
+                (key, name)
+                for key in ContactIndex.record_keys(record)
+                if key.startswith(("n:", "a:"))
+            ],
+        )
+
+    def _write_terms(self, name, note):
+        terms = note_terms(note)
+        self.conn.executemany(
+            "INSERT INTO terms (term, name, note_id, tf) VALUES (?, ?, ?, ?)",
+            [(term, name, note.id, tf) for term, tf in terms.items()],
+        )
+        self.conn.execute(
+            "INSERT INTO note_lengths (name, note_id, length) VALUES (?, ?, ?)",
+            (name, note.id, sum(terms.values())),
+        )
+
+    def open_book(self):
+        book = AddressBook()
+        book.data = LazyRecords(self, book)
+        book.storage = self
+        return book
+
+    def sync(self):
+        self.flush()
+        self.conn.commit()
+
+    def close(self):
+        self.sync()
+        self.conn.close()
+
+    @contextmanager
+    def batch(self):
+        self.batch_depth += 1
+        try:
+            yield
+        finally:
+            self.batch_depth -= 1
+            if not self.batch_depth:
+                self.sync()
+
+    def record_changed(self, record):
+        self.dirty[record.name.value] = record
+
+    def record_deleted(self, name):
+        self.dirty.pop(name, None)
+        for key in [key for key in self.dirty_notes if key[0] == name]:
+            del self.dirty_notes[key]
+        self.deleted.add(name)
+
+    def note_changed(self, record, note):
+        self.dirty_notes[(record.name.value, note.id)] = (record, note)
+
+    def note_deleted(self, record, note):
+        self.dirty_notes[(record.name.value, note.id)] = (record, None)
+
+    def flush(self):
+        if not (self.deleted or self.dirty or self.dirty_notes):
+            return
+        with self.flush_lock:
+            for name in self.deleted:
+                self._delete_record(name)
+            for record in self.dirty.values():
+                self._write_record(record)
+            for (name, note_id), (record, note) in self.dirty_notes.items():
+                if note is None:
+                    self._delete_note(name, note_id)
+                else:
+                    self._write_note(record, note)
+            self.deleted.clear()
+            self.dirty.clear()
+            self.dirty_notes.clear()
+
+    def _write_record(self, record):
+        name = record.name.value
+        fields = (
+            ("phones", [p.value for p in record.phones]),
+            ("emails", [str(e) for e in record.emails]),
+            ("addresses", [a.value for a in record.addresses]),
+        )
+        self.conn.execute(
+            "INSERT INTO records (name, birthday, next_note_id) VALUES (?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET "
+            "birthday = excluded.birthday, next_note_id = excluded.next_note_id",
+            (name, str(record.birthday) if record.birthday else None, record.next_note_id),
+        )
+        for table, values in fields:
+            self.conn.execute(f"DELETE FROM {table} WHERE name = ?", (name,))
+            self.conn.executemany(
+                f"INSERT INTO {table} (name, value) VALUES (?, ?)",
+                [(name, v) for v in values],
+            )
+        self._write_contact_keys(record)
+
+    def _delete_record(self, name):
+        for table in (
+            "records", "phones", "emails", "addresses", "contact_keys", "notes", "tags"
+        ):
+            self.conn.execute(f"DELETE FROM {table} WHERE name = ?", (name,))
+        for table in ("terms", "note_lengths"):
+            self.conn.execute(f"DELETE FROM {table} WHERE name = ?", (name,))
+
+    def _write_note(self, record, note):
+        name = record.name.value
+        self.conn.execute(
+            "INSERT INTO notes (name, id, text, created_at, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (name, id) DO UPDATE SET "
+            "text = excluded.text, updated_at = excluded.updated_at",
+            (
+                name,
+                note.id,
+                note.text,
+                note.created_at.isoformat(),
+                note.updated_at.isoformat(),
+            ),
+        )
+        self.conn.execute(
+            "DELETE FROM tags WHERE name = ? AND note_id = ?", (name, note.id)
+        )
+        self.conn.executemany(
+            "INSERT INTO tags (name, note_id, tag) VALUES (?, ?, ?)",
+            [(name, note.id, t) for t in note.tags],
+        )
+        self._delete_terms(name, note.id)
+        self._write_terms(name, note)
+        self.conn.execute(
+            "UPDATE records SET next_note_id = ? WHERE name = ?",
+            (record.next_note_id, name),
+        )
+
+    def _delete_note(self, name, note_id):
+        self.conn.execute("DELETE FROM notes WHERE name = ? AND id = ?", (name, note_id))
+        self.conn.execute(
+            "DELETE FROM tags WHERE name = ? AND note_id = ?", (name, note_id)
+        )
+        self._delete_terms(name, note_id)
+
+    def _delete_terms(self, name, note_id):
+        self.conn.execute(
+            "DELETE FROM terms WHERE name = ? AND note_id = ?", (name, note_id)
+        )
+        self.conn.execute(
+            "DELETE FROM note_lengths WHERE name = ? AND note_id = ?", (name, note_id)
+        )
+
+    def count(self):
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def contains(self, name):
+        self.flush()
+        row = self.conn.execute("SELECT 1 FROM records WHERE name = ?", (name,))
+        return row.fetchone() is not None
+
+    def iter_names(self, start=0):
+        self.flush()
+        last_rowid = 0
+        while True:
+            rows = self.conn.execute(
+                "SELECT rowid, name FROM records WHERE rowid > ? ORDER BY rowid LIMIT ? OFFSET ?",
+                (last_rowid, self.BATCH_SIZE, start if not last_rowid else 0),
+            ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            yield [name for _, name in rows]
+
+    def load_records(self, names):
+        self.flush()
+        marks = ",".join("?" * len(names))
+        records = {}
+        for name, birthday, next_note_id in self.conn.execute(
+            f"SELECT name, birthday, next_note_id FROM records WHERE name IN ({marks})",
+            names,
+        ):
+            record = Record(name)
+            record.birthday = Birthday(birthday) if birthday else None
+            record.next_note_id = next_note_id
+            records[name] = record
+        if not records:
+            return records
+
+        for name, value in self._select_field("phones", marks, names):
+            records[name].phones.append(Phone(value))
+        for name, value in self._select_field("emails", marks, names):
+            records[name].emails.append(value)
+        for name, value in self._select_field("addresses", marks, names):
+            records[name].addresses.append(Address(value))
+
+        notes = {}
+        for name, note_id, text, created_at, updated_at in self.conn.execute(
+            f"SELECT name, id, text, created_at, updated_at FROM notes "
+            f"WHERE name IN ({marks}) ORDER BY id",
+            names,
+        ):
+            record = records[name]
+            note = Note(note_id, text)
+            note.created_at = datetime.fromisoformat(created_at)
+            note.updated_at = datetime.fromisoformat(updated_at)
+            note.owner = record
+            record.notes[note.id] = note
+            notes[(name, note_id)] = note
+        for name, note_id, tag in self.conn.execute(
+            f"SELECT name, note_id, tag FROM tags WHERE name IN ({marks}) ORDER BY rowid",
+            names,
+        ):
+            notes[(name, note_id)].tags += (sys.intern(tag),)
+        return records
+
+    def _select_field(self, table, marks, names):
+        return self.conn.execute(
+            f"SELECT name, value FROM {table} WHERE name IN ({marks}) ORDER BY rowid",
+            names,
+        )
+
+
+class SqliteRankIndex(Bm25):
+    def __init__(self, storage):
+        self.storage = storage
+        self.conn = storage.conn
+
+    def stats(self):
+        self.storage.flush()
+        return self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM note_lengths"
+        ).fetchone()
+
+    def matches(self, term):
+        return [
+            ((name, note_id), tf, length)
+            for name, note_id, tf, length in self.conn.execute(
+                "SELECT t.name, t.note_id, t.tf, l.length FROM terms t "
+                "JOIN note_lengths l ON l.name = t.name AND l.note_id = t.note_id "
+                "WHERE t.term = ?",
+                (term,),
+            )
+        ]
+
+
+class LazyRecords(MutableMapping):
+    def __init__(self, storage, book, cache_size=RECORD_CACHE_SIZE):
+        self.storage = storage
+        self.book = book
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def _remember(self, name, record):
+        # pop + set instead of move_to_end: server readers share this cache.
+        self._cache.pop(name, None)
+        self._cache[name] = record
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def __getitem__(self, name):
+        record = self._cache.get(name)
+        if record is None:
+            record = self.storage.load_records([name]).get(name)
+            if record is None:
+                raise KeyError(name)
+            record.book = self.book
+        self._remember(name, record)
+        return record
+
+    def __setitem__(self, name, record):
+        self._remember(name, record)
+
+    def __delitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+        self._cache.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self._cache or self.storage.contains(name)
+
+    def __iter__(self):
+        for names in self.storage.iter_names():
+            yield from names
+
+    def __len__(self):
+        return self.storage.count()
+
+    def values(self, start=0):
+        for names in self.storage.iter_names(start):
+            loaded = self.storage.load_records(names)
+            for name in names:
+                record = self._cache.get(name) or loaded[name]
+                record.book = self.book
+                yield record
+
+
+def split_values(value) -> list[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(";")
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+def record_to_row(record) -> dict:
+    return {
+        "name": record.name.value,
+        "phones": [p.value for p in record.phones],
+        "emails": [str(e) for e in record.emails],
+        "addresses": [a.value for a in record.addresses],
+        "birthday": str(record.birthday) if record.birthday else "",
+        "notes": [
+            {
+                "text": n.text,
+                "tags": list(n.tags),
+                "created_at": n.created_at.isoformat(),
+                "updated_at": n.updated_at.isoformat(),
+            }
+            for n in record.notes.values()
+        ],
+    }
+
+
+def row_to_note(data) -> Note:
+    if isinstance(data, str):
+        data = {"text": data}
+    text = normalize_note_text(str(data.get("text") or ""))
+    if not text:
+        raise ContactError("Note text cannot be empty.")
+    note = Note(0, text, split_values(data.get("tags")))
+    if data.get("created_at"):
+        note.created_at = datetime.fromisoformat(data["created_at"])
+    note.updated_at = (
+        datetime.fromisoformat(data["updated_at"])
+        if data.get("updated_at")
+        else note.created_at
+    )
+    return note
+
+
+def read_import_rows(path):
+    import csv
+
+    if not path.endswith((".csv", ".jsonl")):
+        raise ValueError(path)
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, e
+
+
+def import_row(book, row) -> bool:
+    if not isinstance(row, dict):
+        raise ContactError("A row must be an object with a name.")
+    name = str(row.get("name") or "").strip()
+    if not name:
+        raise ContactError("The contact name is required.")
+    phones = [Phone(v) for v in split_values(row.get("phones"))]
+    emails = [Email(v).value for v in split_values(row.get("emails"))]
+    addresses = []
+    for value in split_values(row.get("addresses")):
+        address = Address(value)
+        # Address() skips validation; the setter checks the value.
+        address.value = value
+        addresses.append(address)
+    birthday = Birthday(row["birthday"]) if row.get("birthday") else None
+    notes = row.get("notes") or []
+    if not isinstance(notes, list) or not all(isinstance(n, (str, dict)) for n in notes):
+        raise ContactError("Notes must be a list of texts or objects.")
+    notes = [row_to_note(n) for n in notes]
+
+    record = book.find(name)
+    is_new = record is None
+    if is_new:
+        record = Record(name)
+    for phone in phones:
+        if not any(p.value == phone.value for p in record.phones):
+            record.phones.append(phone)
+    for email in emails:
+        if email not in [str(e) for e in record.emails]:
+            record.emails.append(email)
+    for address in addresses:
+        if address.value not in [a.value for a in record.addresses]:
+            record.addresses.append(address)
+    if birthday is not None:
+        record.birthday = birthday
+    # Re-importing an export must not duplicate the notes it already holds.
+    existing = {(n.text, n.tags) for n in record.notes.values()}
+    notes = [n for n in notes if (n.text, n.tags) not in existing]
+    for note in notes:
+        note.id = record.next_note_id
+        note.owner = record
+        record.notes[note.id] = note
+        record.next_note_id += 1
+
+    if is_new:
+        book.add_record(record)
+    else:
+        record.changed()
+        for note in notes:
+            record.note_changed(note)
+    return is_new
+
+
+def import_contacts(book, path):
+    rows = read_import_rows(path)
+    imported = created = error_count = 0
+    errors = []
+    batch_no = 0
+    with book.batch():
+        while batch := list(islice(rows, IMPORT_BATCH_SIZE)):
+            batch_no += 1
+            if batch_no == 2:
+                book.drop_indexes()
+            with book.batch():
+                for line_no, row in batch:
+                    try:
+                        if isinstance(row, Exception):
+                            raise row
+                        created += import_row(book, row)
+                        imported += 1
+                    except Exception as e:
+                        error_count += 1
+                        if len(errors) < IMPORT_ERRORS_SHOWN:
+                            errors.append(f"line {line_no}: {str(e).strip()}")
+    return imported, created, error_count, errors
+
+
+def export_contacts(book, path) -> int:
+    import csv
+
+    if not path.endswith((".csv", ".jsonl")):
+        raise ValueError(path)
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            writer = csv.DictWriter(f, CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+        for record in book.data.values():
+            row = record_to_row(record)
+            if path.endswith(".csv"):
+                for field in ("phones", "emails", "addresses"):
+                    row[field] = ";".join(row[field])
+                writer.writerow(row)
+            else:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            count += 1
+    return count
 
 
 def parse_input(user_input):
@@ -547,15 +2686,88 @@ def show_phone(args, book: AddressBook):
 
 
 @input_error
-def show_all(book):
+def who_has_cmd(args, book: AddressBook):
+    if not args:
+        return "ℹ️  Usage: who-has <phone|email|address>"
+    value = " ".join(args)
+    names = sorted(book.ensure_contact_index().who_has(value))
+    if not names:
+        return f"ℹ️  Nobody has {value}.\n"
+    return f"{value} belongs to: {GREEN}{', '.join(names)}{RESET}\n"
+
+
+def find_similar_contacts(name, book):
+    names = book.ensure_name_index().closest(name) if name else []
+    if not names:
+        return f"ℹ️  No contacts look like '{name}'.\n"
+    lines = [f"\n{LIGHT_GRAY_BG} Contacts similar to '{name}': {RESET_BG}"]
+    lines.extend(str(book.data[found]) for found in names)
+    return "\n".join(lines) + "\n"
+
+
+@input_error
+def find_contacts_cmd(args, book: AddressBook):
+    if not args:
+        return "ℹ️  Usage: find <name|phone|email prefix> | find ~<name>"
+    prefix = " ".join(args)
+    if prefix.startswith("~"):
+        return find_similar_contacts(prefix[1:].strip(), book)
+    index = book.ensure_contact_index()
+    names = []
+    seen = set()
+    more = False
+    key_prefixes = ["n:" + prefix.casefold(), "e:" + normalize_email(prefix)]
+    if normalize_phone(prefix):
+        key_prefixes.append("p:" + normalize_phone(prefix))
+    for key_prefix in key_prefixes:
+        for name in index.prefix(key_prefix):
+            if name in seen:
+                continue
+            if len(names) == FIND_LIMIT:
+                more = True
+                break
+            seen.add(name)
+            names.append(name)
+    if not names:
+        return f"ℹ️  No contacts start with '{prefix}'.\n"
+    lines = [f"\n{LIGHT_GRAY_BG} Contacts matching '{prefix}': {RESET_BG}"]
+    lines.extend(str(book.data[name]) for name in names)
+    if more:
+        lines.append(f"ℹ️  Showing the first {FIND_LIMIT} matches.")
+    return "\n".join(lines) + "\n"
+
+
+@input_error
+def show_all(args, book):
+    page, page_size, sort = 1, ALL_PAGE_SIZE, None
+    options = list(args)
+    while options:
+        option = options.pop(0)
+        if option == "--page":
+            page = int(options.pop(0))
+        elif option == "--page-size":
+            page_size = int(options.pop(0))
+        elif option == "--sort":
+            sort = options.pop(0)
+        else:
+            raise ValueError(option)
+    if sort not in ALL_SORT_KEYS or page < 1 or page_size < 1:
+        raise ValueError(sort)
+
     if not book.data:
         return "ℹ️  The address book is empty.\n"
 
-    result = f"\n{LIGHT_GRAY_BG} All contacts: {RESET_BG}\n"
-    for record in book.data.values():
-        result += str(record) + "\n"
-
-    return result
+    pages = max(1, math.ceil(book.count_records(sort) / page_size))
+    if page > pages:
+        return f"ℹ️  There is no page {page}. The list has {pages} page(s).\n"
+    records = islice(book.iter_records(sort, (page - 1) * page_size), page_size)
+    lines = [f"\n{LIGHT_GRAY_BG} All contacts: {RESET_BG}"]
+    lines.extend(str(record) for record in records)
+    if page < pages:
+        lines.append(
+            f"ℹ️  Page {page} of {pages}. Use 'all --page {page + 1}' to see more."
+        )
+    return "\n".join(lines) + "\n"
 
 
 @input_error
@@ -599,10 +2811,11 @@ def show_birthday(args, book: AddressBook):
 
 
 @input_error
-def upcoming_birthdays(book: AddressBook):
-    upcoming = book.get_upcoming_birthdays()
+def upcoming_birthdays(args, book: AddressBook):
+    days = int(args[0]) if args else 7
+    upcoming = book.get_upcoming_birthdays(days)
     if not upcoming:
-        return "ℹ️  There are no birthdays next week.\n"
+        return f"ℹ️  There are no birthdays in the next {days} days.\n"
     output = f"\n{LIGHT_GRAY_BG} Upcoming birthdays: {RESET_BG}\n"
     for item in upcoming:
         output += f" {item['name']} needs to be congratulated on: {GREEN}{item['congratulation_date']}{RESET}\n"
@@ -632,22 +2845,43 @@ def add_note_cmd(args, book: AddressBook):
 @input_error
 def list_notes_cmd(args, book: AddressBook):
     if len(args) < 1:
-        return "ℹ️  Usage: list-notes <name> [--sort tags]"
+        return "ℹ️  Usage: list-notes <name> [--sort tags] [--page N] [--page-size K]"
     name = args[0]
     sort_by_tags = False
-    if len(args) >= 3 and args[1] in ("--sort", "-s") and args[2] == "tags":
-        sort_by_tags = True
+    page, page_size = 1, NOTES_PAGE_SIZE
+    options = list(args[1:])
+    while options:
+        option = options.pop(0)
+        if option in ("--sort", "-s"):
+            sort_by_tags = options.pop(0) == "tags"
+        elif option == "--page":
+            page = int(options.pop(0))
+        elif option == "--page-size":
+            page_size = int(options.pop(0))
+        else:
+            raise ValueError(option)
+    if page < 1 or page_size < 1:
+        raise ValueError(page)
     record = book.find(name)
     if record is None:
         raise KeyError
     if not record.notes:
         return f"ℹ️  No notes for contact {name}."
-    notes = record.list_notes_sorted_by_tags() if sort_by_tags else record.list_notes()
+    start = (page - 1) * page_size
+    if sort_by_tags:
+        notes = islice(record.iter_notes_by_tags(start), page_size)
+    else:
+        notes = islice(record.notes.values(), start, start + page_size)
     lines = [f"\n{LIGHT_GRAY_BG}Notes for {name}:{RESET_BG}"]
     for n in notes:
-        ensure_note_has_tags(n)
         tag_suffix = f" [#{', #'.join(n.tags)}]" if n.tags else ""
         lines.append(f"- [{n.id}] {n.text}{tag_suffix}")
+    pages = max(1, math.ceil(len(record.notes) / page_size))
+    if page < pages:
+        sort_option = " --sort tags" if sort_by_tags else ""
+        lines.append(
+            f"ℹ️  Page {page} of {pages}. Use 'list-notes {name}{sort_option} --page {page + 1}' to see more."
+        )
     return "\n".join(lines)
 
 
@@ -663,9 +2897,8 @@ def search_notes_cmd(args, book: AddressBook):
     found = record.search_notes(query)
     if not found:
         return f"ℹ️  No notes matched '{query}' for contact {name}."
-    lines = [f"Found notes for {name} (query: '{query}'):"]
+    lines = [f"\n{LIGHT_GRAY_BG}Found notes for {name} (query: '{query}'):{RESET_BG}"]
     for n in found:
-        ensure_note_has_tags(n)
         tag_suffix = f" [{BLUE}#{', #'.join(n.tags)}{RESET}]" if n.tags else ""
         lines.append(f"- [{n.id}] {n.text}{tag_suffix}")
     return "\n".join(lines)
@@ -700,6 +2933,46 @@ def delete_note_cmd(args, book: AddressBook):
     return record.delete_note(note_id)
 
 
+def parse_day(value) -> datetime:
+    try:
+        return datetime.strptime(value, "%d.%m.%Y")
+    except ValueError:
+        raise DateValidationError("⚠️  Invalid date format. Use DD.MM.YYYY\n")
+
+
+def format_timeline(notes, title):
+    if not notes:
+        return "ℹ️  No notes were changed in that period."
+    lines = [f"\n{LIGHT_GRAY_BG}{title}{RESET_BG}"]
+    for note in notes:
+        tag_suffix = f" [{BLUE}#{', #'.join(note.tags)}{RESET}]" if note.tags else ""
+        lines.append(
+            f"- {note.updated_at:%d.%m.%Y %H:%M} {GREEN}{note.owner.name.value}{RESET} [{note.id}]: {note.text}{tag_suffix}"
+        )
+    if len(notes) == TIMELINE_LIMIT:
+        lines.append(f"ℹ️  Showing the {TIMELINE_LIMIT} most recent changes.")
+    return "\n".join(lines)
+
+
+@input_error
+def notes_since_cmd(args, book: AddressBook):
+    if len(args) != 1:
+        return "ℹ️  Usage: notes-since <DD.MM.YYYY>"
+    start = parse_day(args[0])
+    notes = book.notes_between(start, datetime.max)
+    return format_timeline(notes, f"Notes changed since {args[0]}:")
+
+
+@input_error
+def notes_between_cmd(args, book: AddressBook):
+    if len(args) != 2:
+        return "ℹ️  Usage: notes-between <DD.MM.YYYY> <DD.MM.YYYY>"
+    start = parse_day(args[0])
+    end = parse_day(args[1]) + timedelta(days=1)
+    notes = book.notes_between(start, end)
+    return format_timeline(notes, f"Notes changed between {args[0]} and {args[1]}:")
+
+
 @input_error
 def find_notes_cmd(args, book: AddressBook):
     if not args:
@@ -710,7 +2983,30 @@ def find_notes_cmd(args, book: AddressBook):
         return f"ℹ️  No notes matched '{query}'."
     lines = [f"\n{LIGHT_GRAY_BG}Global notes search (query: '{query}'):{RESET_BG}"]
     for item in results:
-        lines.append(f"- {item['name']} [{item['note_id']}]: {item['text']}")
+        lines.append(f"- {GREEN}{item['name']}{RESET} [{item['note_id']}]: {item['text']}")
+    return "\n".join(lines)
+
+
+@input_error
+def rank_notes_cmd(args, book: AddressBook):
+    if not args:
+        return "ℹ️  Usage: rank-notes <query> [--top N]"
+    limit = RANK_LIMIT
+    tokens = list(args)
+    if "--top" in tokens:
+        top_index = tokens.index("--top")
+        limit = int(tokens[top_index + 1])
+        del tokens[top_index : top_index + 2]
+    query = " ".join(tokens)
+    results = book.rank_notes(query, limit)
+    if not results:
+        return f"ℹ️  No notes matched '{query}'."
+    lines = [f"\n{LIGHT_GRAY_BG}Best matching notes (query: '{query}'):{RESET_BG}"]
+    for item in results:
+        tag_suffix = f" [{BLUE}#{', #'.join(item['tags'])}{RESET}]" if item["tags"] else ""
+        lines.append(
+            f"- {GREEN}{item['name']}{RESET} [{item['note_id']}]: {item['text']}{tag_suffix} (score: {item['score']:.2f})"
+        )
     return "\n".join(lines)
 
 
@@ -799,7 +3095,6 @@ def search_tags_cmd(args, book: AddressBook):
         f"Notes for {name} matching {criterion} of tags: {', '.join('#' + t for t in tags)}"
     ]
     for note, match_count in found:
-        ensure_note_has_tags(note)
         tag_suffix = f" [#{', #'.join(note.tags)}]" if note.tags else ""
         lines.append(f"- [{note.id}] {note.text}{tag_suffix} (matches: {match_count})")
     return "\n".join(lines)
@@ -808,16 +3103,21 @@ def search_tags_cmd(args, book: AddressBook):
 @input_error
 def find_tags_cmd(args, book: AddressBook):
     if not args:
-        return "ℹ️  Usage: find-tags <tag1> [tag2 ...] [--any]"
+        return "ℹ️  Usage: find-tags <tag1> [tag2 ...] [--any] [--top N]"
     match_all = True
+    limit = None
     tags_tokens = list(args)
+    if "--top" in tags_tokens:
+        top_index = tags_tokens.index("--top")
+        limit = int(tags_tokens[top_index + 1])
+        del tags_tokens[top_index : top_index + 2]
     if "--any" in tags_tokens:
         match_all = False
         tags_tokens = [t for t in tags_tokens if t != "--any"]
     tags = normalize_tags(tags_tokens)
     if not tags:
         return "Provide at least one tag."
-    results = book.search_notes_by_tags_global(tags, match_all=match_all)
+    results = book.search_notes_by_tags_global(tags, match_all=match_all, limit=limit)
     if not results:
         return "ℹ️  No notes matched the given tags."
     criterion = "all" if match_all else "any"
@@ -833,314 +3133,594 @@ def find_tags_cmd(args, book: AddressBook):
 
 
 @input_error
-def add_note_cmd(args, book: AddressBook):
-    if len(args) < 2:
-        return "ℹ️  Usage: add-note <name> <note text> [tags: <tag1,tag2,...>]"
-    name = args[0]
-    if "tags:" in args:
-        tags_index = args.index("tags:")
-        text_tokens = args[1:tags_index]
-        tag_tokens = args[tags_index + 1 :]
-        text = " ".join(text_tokens).strip()
-        tags = normalize_tags(tag_tokens) if tag_tokens else []
-    else:
-        text = " ".join(args[1:]).strip()
-        tags = []
-    record = book.find(name)
-    if record is None:
-        raise KeyError
-    return record.add_note(text, tags)
+def import_cmd(args, book: AddressBook):
+    if not args:
+        return "ℹ️  Usage: import <file.csv|file.jsonl>"
+    path = " ".join(args)
+    started = time.perf_counter()
+    imported, created, error_count, errors = import_contacts(book, path)
+    elapsed = time.perf_counter() - started
+    lines = [
+        f"✅ Imported {imported} rows ({created} new contacts) from {path} in {elapsed:.2f}s."
+    ]
+    if error_count:
+        lines.append(f"⚠️  {error_count} rows skipped:")
+        lines.extend(f"  {e}" for e in errors)
+        if error_count > len(errors):
+            lines.append(f"  ... and {error_count - len(errors)} more.")
+    return "\n".join(lines) + "\n"
 
 
 @input_error
-def list_notes_cmd(args, book: AddressBook):
-    if len(args) < 1:
-        return "ℹ️  Usage: list-notes <name> [--sort tags]"
-    name = args[0]
-    sort_by_tags = False
-    if len(args) >= 3 and args[1] in ("--sort", "-s") and args[2] == "tags":
-        sort_by_tags = True
-    record = book.find(name)
-    if record is None:
-        raise KeyError
-    if not record.notes:
-        return f"ℹ️  No notes for contact {name}."
-    notes = record.list_notes_sorted_by_tags() if sort_by_tags else record.list_notes()
-    lines = [f"\n{LIGHT_GRAY_BG}Notes for {name}:{RESET_BG}"]
-    for n in notes:
-        ensure_note_has_tags(n)
-        tag_suffix = f" [#{', #'.join(n.tags)}]" if n.tags else ""
-        lines.append(f"- [{n.id}] {n.text}{tag_suffix}")
-    return "\n".join(lines)
-
-
-@input_error
-def search_notes_cmd(args, book: AddressBook):
-    if len(args) < 2:
-        return "ℹ️  Usage: search-notes <name> <query>"
-    name = args[0]
-    query = " ".join(args[1:])
-    record = book.find(name)
-    if record is None:
-        raise KeyError
-    found = record.search_notes(query)
-    if not found:
-        return f"ℹ️  No notes matched '{query}' for contact {name}."
-    lines = [f"\n{LIGHT_GRAY_BG}Found notes for {name} (query: '{query}'):{RESET_BG}"]
-    for n in found:
-        ensure_note_has_tags(n)
-        tag_suffix = f" [{BLUE}#{', #'.join(n.tags)}{RESET}]" if n.tags else ""
-        lines.append(f"- [{n.id}] {n.text}{tag_suffix}")
-    return "\n".join(lines)
-
-
-@input_error
-def edit_note_cmd(args, book: AddressBook):
-    if len(args) < 3:
-        return "ℹ️  Usage: edit-note <name> <note_id> <new text>"
-    name = args[0]
-    try:
-        note_id = int(args[1])
-    except ValueError:
-        return "note_id must be an integer."
-    new_text = " ".join(args[2:])
-    record = book.find(name)
-    if record is None:
-        raise KeyError
-    return record.edit_note(note_id, new_text)
-
-
-@input_error
-def delete_note_cmd(args, book: AddressBook):
-    name, note_id_str = args
-    try:
-        note_id = int(note_id_str)
-    except ValueError:
-        return "note_id must be an integer."
-    record = book.find(name)
-    if record is None:
-        raise KeyError
-    return record.delete_note(note_id)
-
-
-@input_error
-def find_notes_cmd(args, book: AddressBook):
+def export_cmd(args, book: AddressBook):
     if not args:
-        return "ℹ️  Usage: find-notes <query>"
-    query = " ".join(args)
-    results = book.search_notes_global(query)
-    if not results:
-        return f"ℹ️  No notes matched '{query}'."
-    lines = [f"\n{LIGHT_GRAY_BG}Global notes search (query: '{query}'):{RESET_BG}"]
-    for item in results:
-        lines.append(f"- {GREEN}{item['name']}{RESET} [{item['note_id']}]: {item['text']}")
-    return "\n".join(lines)
+        return "ℹ️  Usage: export <file.csv|file.jsonl>"
+    path = " ".join(args)
+    count = export_contacts(book, path)
+    return f"✅ Exported {count} contacts to {path}.\n"
 
 
 @input_error
-def add_tags_cmd(args, book: AddressBook):
-    if len(args) < 3:
-        return "ℹ️  Usage: add-tags <name> <note_id> <tag1> [tag2 ...]"
-    name = args[0]
-    try:
-        note_id = int(args[1])
-    except ValueError:
-        return "note_id must be an integer."
-    tags = normalize_tags(args[2:])
-    if not tags:
-        return "Provide at least one tag."
-    record = book.find(name)
-    if record is None:
-        raise KeyError
-    note = record.find_note(note_id)
-    if note is None:
-        raise NoteNotFoundError(f"Note [{note_id}] not found for contact {name}.")
-    note.add_tags(tags)
-    return f"Tags added to note [{note_id}] for contact {name}: {', '.join('#' + t for t in tags)}"
-
-
-@input_error
-def remove_tags_cmd(args, book: AddressBook):
-    if len(args) < 3:
-        return "ℹ️  Usage: remove-tags <name> <note_id> <tag1> [tag2 ...]"
-    name = args[0]
-    try:
-        note_id = int(args[1])
-    except ValueError:
-        return "note_id must be an integer."
-    tags = normalize_tags(args[2:])
-    if not tags:
-        return "Provide at least one tag."
-    record = book.find(name)
-    if record is None:
-        raise KeyError
-    note = record.find_note(note_id)
-    if note is None:
-        raise NoteNotFoundError(f"Note [{note_id}] not found for contact {name}.")
-    note.remove_tags(tags)
-    return f"Tags removed from note [{note_id}] for contact {name}: {', '.join('#' + t for t in tags)}"
+def save_stats_cmd(args, book: AddressBook):
+    if book.autosaver is None:
+        return "ℹ️  Autosave is off."
+    stats = book.autosaver.stats()
+    return (
+        f"Autosaves: {stats['saves']}, last {stats['last_ms']} ms, "
+        f"avg {stats['avg_ms']} ms, max {stats['max_ms']} ms; "
+        f"{stats['pending']} unsaved changes."
+    )
 
 
-@input_error
-def clear_tags_cmd(args, book: AddressBook):
-    name, note_id_str = args
-    try:
-        note_id = int(note_id_str)
-    except ValueError:
-        return "note_id must be an integer."
-    record = book.find(name)
-    if record is None:
-        raise KeyError
-    note = record.find_note(note_id)
-    if note is None:
-        raise NoteNotFoundError(f"Note [{note_id}] not found for contact {name}.")
-    note.clear_tags()
-    return f"All tags cleared for note [{note_id}] of contact {name}."
+def format_command_stats(summary):
+    if not summary:
+        return "ℹ️  No commands measured yet."
+    lines = [f"\n{LIGHT_GRAY_BG}Command stats (latency in ms):{RESET_BG}"]
+    for name, row in summary.items():
+        errors = ", ".join(f"{kind} x{count}" for kind, count in row["errors"].items())
+        lines.append(
+            f"{GREEN}{name:<14}{RESET} calls {row['calls']:>6}  "
+            f"p50 {row['p50_ms']:>8}  p95 {row['p95_ms']:>8}  p99 {row['p99_ms']:>8}  "
+            f"result avg {row['avg_result_chars']} / max {row['max_result_chars']} chars"
+            + (f"  {RED}errors: {errors}{RESET}" if errors else "")
+        )
+    return "\n".join(lines)
 
 
-@input_error
-def search_tags_cmd(args, book: AddressBook):
-    if len(args) < 2:
-        return "ℹ️  Usage: search-tags <name> <tag1> [tag2 ...] [--any]"
-    name = args[0]
-    match_all = True
-    tags_tokens = args[1:]
-    if "--any" in tags_tokens:
-        match_all = False
-        tags_tokens = [t for t in tags_tokens if t != "--any"]
-    tags = normalize_tags(tags_tokens)
-    if not tags:
-        return "Provide at least one tag."
-    record = book.find(name)
-    if record is None:
-        raise KeyError
-    found = record.search_notes_by_tags(tags, match_all=match_all)
-    if not found:
-        return f"ℹ️  No notes matched tags for contact {name}."
-    criterion = "all" if match_all else "any"
-    lines = [
-        f"Notes for {name} matching {criterion} of tags: {', '.join('#' + t for t in tags)}"
-    ]
-    for note, match_count in found:
-        ensure_note_has_tags(note)
-        tag_suffix = f" [#{', #'.join(note.tags)}]" if note.tags else ""
-        lines.append(f"- [{note.id}] {note.text}{tag_suffix} (matches: {match_count})")
-    return "\n".join(lines)
+def command_stats_summary():
+    return command_stats.summary({func.__name__: name for name, func in commands.items()})
 
 
 @input_error
-def find_tags_cmd(args, book: AddressBook):
-    if not args:
-        return "ℹ️  Usage: find-tags <tag1> [tag2 ...] [--any]"
-    match_all = True
-    tags_tokens = list(args)
-    if "--any" in tags_tokens:
-        match_all = False
-        tags_tokens = [t for t in tags_tokens if t != "--any"]
-    tags = normalize_tags(tags_tokens)
-    if not tags:
-        return "Provide at least one tag."
-    results = book.search_notes_by_tags_global(tags, match_all=match_all)
-    if not results:
-        return "ℹ️  No notes matched the given tags."
-    criterion = "all" if match_all else "any"
-    lines = [
-        f"\n{LIGHT_GRAY_BG}Global notes search by {criterion} tags: {', '.join('#' + t for t in tags)}{RESET_BG}"
-    ]
-    for item in results:
-        tag_suffix = f" [{BLUE}#{', #'.join(item['tags'])}{RESET}]" if item.get("tags") else ""
-        lines.append(
-            f"- {GREEN}{item['name']}{RESET} [{item['note_id']}]: {item['text']}{tag_suffix} (matches: {item['matches']})\n"
+def stats_cmd(args, book: AddressBook):
+    if command_stats is None:
+        return "ℹ️  Command stats are off. Start the bot with --stats to collect them."
+    return format_command_stats(command_stats_summary())
+
+
+def dump_command_stats(target):
+    if command_stats is None:
+        return
+    if target == "-":
+        print(format_command_stats(command_stats_summary()))
+        return
+    with open(target, "w", encoding="utf-8") as f:
+        json.dump(command_stats_summary(), f, indent=2)
+
+
+def deletes(word, max_edits=SUGGEST_MAX_EDITS) -> set[str]:
+    found = {word}
+    frontier = {word}
+    for _ in range(max_edits):
+        frontier = {w[:i] + w[i + 1 :] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+class TrieNode:
+    __slots__ = ("children", "words")
+
+    def __init__(self):
+        self.children: dict[str, TrieNode] = {}
+        self.words: list[str] = []
+
+
+class CommandRegistry(UserDict):
+    def __init__(self, handlers=None):
+        self.trie = TrieNode()
+        self.neighbours: dict[str, set[str]] = {}
+        self.infixes: dict[str, set[str]] = {}
+        self.words: set[str] = set()
+        self.longest = 0
+        super().__init__(handlers)
+
+    def __setitem__(self, name, handler):
+        super().__setitem__(name, handler)
+        self.add_word(name)
+
+    def add_word(self, name):
+        if name in self.words:
+            return
+        self.words.add(name)
+        self.longest = max(self.longest, len(name))
+        node = self.trie
+        insort(node.words, name)
+        for char in name:
+            node = node.children.setdefault(char, TrieNode())
+            insort(node.words, name)
+        for variant in deletes(name):
+            self.neighbours.setdefault(variant, set()).add(name)
+        for i in range(len(name)):
+            for j in range(i + 1, len(name) + 1):
+                self.infixes.setdefault(name[i:j], set()).add(name)
+
+    def complete(self, prefix) -> list[str]:
+        node = self.trie
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.words
+
+    def suggest(self, word, limit=SUGGEST_LIMIT) -> list[str]:
+        # Nothing that long is within reach, and its delete set grows as O(L^2).
+        if len(word) > self.longest + SUGGEST_MAX_EDITS:
+            return []
+        close = set()
+        for variant in deletes(word):
+            close |= self.neighbours.get(variant, set())
+        distances = {name: edit_distance(word, name) for name in close}
+        fuzzy = sorted(
+            (name for name, distance in distances.items() if distance <= SUGGEST_MAX_EDITS),
+            key=lambda name: (distances[name], name),
         )
-    return "\n".join(lines)
+        prefix = self.complete(word)[:limit]
+        infix = sorted(self.infixes.get(word, ()))[:limit]
+        return list(dict.fromkeys(fuzzy + prefix + infix))[:limit]
 
 
-def main():
-    book = load_data()
-    print("\n👋 Welcome to the assistant bot!")
-    print(rf"""
- /$$$$$$$$                  /$$              /$$$$$$$$                               
-|__  $$__/                 | $$             |__  $$__/                               
-   | $$ /$$   /$$  /$$$$$$ | $$$$$$$   /$$$$$$ | $$  /$$$$$$   /$$$$$$  /$$$$$$/$$$$ 
-   | $$| $$  | $$ /$$__  $$| $$__  $$ /$$__  $$| $$ /$$__  $$ /$$__  $$| $$_  $$_  $$
-   | $$| $$  | $$| $$  \ _/| $$  \ $$| $$  \ $$| $$| $$$$$$$$| $$$$$$$$| $$ \ $$ \ $$
-   | $$| $$  | $$| $$      | $$  | $$| $$  | $$| $$| $$_____/| $$_____/| $$ | $$ | $$
-   | $$|  $$$$$$/| $$      | $$$$$$$/|  $$$$$$/| $$|  $$$$$$$|  $$$$$$$| $$ | $$ | $$
-   |__/ \ _____/ |__/      |_______/  \ _____/ |__/ \ ______/ \ ______/|__/ |__/ |__/                                                                                                                                                                                
+def load_prompt(registry):
+    try:
+        from prompt_toolkit import prompt
+        from prompt_toolkit.completion import Completer, Completion
+    except Exception:
+        return input
+
+    class CommandCompleter(Completer):
+        def __init__(self, registry):
+            self.registry = registry
+
+        def get_completions(self, document, complete_event):
+            word = document.text_before_cursor.lstrip()
+            if " " in word:
+                return
+            for name in self.registry.complete(word.lower()):
+                yield Completion(name, start_position=-len(word))
+
+    completer = CommandCompleter(registry)
+    return lambda message: prompt(message, completer=completer)
+
+
+commands = CommandRegistry({
+    "add": add_contact,
+    "add-address": add_address,
+    "add-email": add_email,
+    "change": change_contact,
+    "delete": delete_contact,
+    "all": show_all,
+    "add-birthday": add_birthday,
+    "show-birthday": show_birthday,
+    "birthdays": upcoming_birthdays,
+    "add-note": add_note_cmd,
+    "phone": show_phone,
+    "who-has": who_has_cmd,
+    "find": find_contacts_cmd,
+    "list-notes": list_notes_cmd,
+    "search-notes": search_notes_cmd,
+    "edit-note": edit_note_cmd,
+    "delete-note": delete_note_cmd,
+    "find-notes": find_notes_cmd,
+    "rank-notes": rank_notes_cmd,
+    "notes-since": notes_since_cmd,
+    "notes-between": notes_between_cmd,
+    "add-tags": add_tags_cmd,
+    "remove-tags": remove_tags_cmd,
+    "clear-tags": clear_tags_cmd,
+    "search-tags": search_tags_cmd,
+    "find-tags": find_tags_cmd,
+    "import": import_cmd,
+    "export": export_cmd,
+    "save-stats": save_stats_cmd,
+    "stats": stats_cmd,
+})
+for word in ("hello", "exit", "close"):
+    commands.add_word(word)
+
+
+class ReadWriteLock:
+    def __init__(self):
+        import asyncio
+
+        self._cond = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @asynccontextmanager
+    async def read(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: not self._writer and not self._waiting_writers)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @asynccontextmanager
+    async def write(self):
+        async with self._cond:
+            self._waiting_writers += 1
+            await self._cond.wait_for(lambda: not self._writer and not self._readers)
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+def frame_response(text):
+    lines = [("." + line if line.startswith(".") else line) for line in text.split("\n")]
+    return ("\n".join(lines) + "\n.\n").encode("utf-8")
+
+
+class BotServer:
+    def __init__(self, book, filename, saver=None, workers=SERVER_WORKERS):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.book = book
+        self.filename = filename
+        self.saver = saver
+        self.lock = ReadWriteLock()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        if saver is not None:
+            book.autosaver = saver
+
+    async def dispatch(self, line):
+        import asyncio
+
+        command, args = parse_input(line)
+        if not command:
+            return ""
+        if command == "hello":
+            return "How can I help you?"
+        if command not in commands:
+            suggestions = commands.suggest(command)
+            if suggestions:
+                return f"Did you mean: {', '.join(suggestions)}?"
+            return f"⚠️  Unknown command: {command}"
+        loop = asyncio.get_running_loop()
+        func = commands[command]
+        lock = self.lock.read() if command in READ_ONLY_COMMANDS else self.lock.write()
+        async with lock:
+            return str(await loop.run_in_executor(self.executor, func, args, self.book))
+
+    async def handle_client(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                line = line.decode("utf-8", errors="replace")
+                if parse_input(line)[0] in ("exit", "close"):
+                    break
+                writer.write(frame_response(await self.dispatch(line)))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def autosave(self):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(AUTOSAVE_POLL)
+            if self.saver.due():
+                async with self.lock.write():
+                    await loop.run_in_executor(self.executor, self.saver.save)
+
+    async def serve(self, address):
+        import asyncio
+
+        if address.startswith("unix:"):
+            server = await asyncio.start_unix_server(self.handle_client, address[5:])
+        else:
+            host, _, port = address.rpartition(":")
+            server = await asyncio.start_server(self.handle_client, host or None, int(port))
+        saving = asyncio.create_task(self.autosave()) if self.saver is not None else None
+        print(f"✅ Serving the address book on {address}", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if saving is not None:
+                saving.cancel()
+            self.executor.shutdown()
+
+
+def run_batch(book, lines, filename, save_every=0):
+    executed = 0
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        command, args = parse_input(line)
+        if command in ["exit", "close"]:
+            break
+        elif command == "hello":
+            print("How can I help you?")
+            continue
+        elif command not in commands:
+            print(f"⚠️  Unknown command: {command}")
+            continue
+        print(commands[command](args, book))
+        executed += 1
+        if save_every and executed % save_every == 0:
+            save_data(book, filename)
+    save_data(book, filename)
+    return executed
 
-{GREEN_BG} Available commands! Please use one of the following: {RESET}
 
-{GREEN}hello{RESET}                                          - greet the assistant
+COMMANDS_HELP = rf"""{GREEN}hello{RESET}                                          - greet the assistant
 {GREEN}add {CYAN}<name> <phone>{RESET}                             - add a contact or phone
 {GREEN}change {CYAN}<name> <old_num> <new_num>{RESET}              - change a contact's phone
 {GREEN}phone {CYAN}<name>{RESET}                                   - show phones of a contact
+{GREEN}who-has {CYAN}<phone|email|address>{RESET}                  - show who owns a phone, email or address
+{GREEN}find {CYAN}<prefix>{RESET}                                  - find contacts by name, phone or email prefix
+{GREEN}find {CYAN}~<name>{RESET}                                   - find contacts with similar names (typos allowed)
 {GREEN}add-email {CYAN}<name> <email>{RESET}                       - add an email to contact
-{GREEN}all{RESET}                                            - show all contacts
+{GREEN}all {CYAN}[--page N] [--page-size K] [--sort name|birthday|notes]{RESET}
+                                               - show all contacts page by page
 {GREEN}add-birthday {CYAN}<name> <DD.MM.YYYY]{RESET}               - add a birthday to a contact
 {GREEN}show-birthday {CYAN}<name>{RESET}                           - show the birthday of a contact
-{GREEN}birthdays{RESET}                                      - show upcoming birthdays in the next week
+{GREEN}birthdays {CYAN}[days]{RESET}                               - show upcoming birthdays (default: next 7 days)
 {GREEN}add-note {CYAN}<name> <text> [tags: <t1,t2,...>]{RESET}     - add note
-{GREEN}list-notes {CYAN}<name> [--sort tags]{RESET}                - list contact notes
+{GREEN}list-notes {CYAN}<name> [--sort tags] [--page N]{RESET}     - list contact notes page by page
 {GREEN}search-notes {CYAN}<name> <query>{RESET}                    - search contact notes
 {GREEN}edit-note {CYAN}<name> <note_id> <new text>{RESET}          - edit note
 {GREEN}delete-note {CYAN}<name> <note_id>{RESET}                   - delete note
 {GREEN}find-notes {CYAN}<query>{RESET}                             - global notes search
+{GREEN}rank-notes {CYAN}<query> [--top N]{RESET}                   - best matching notes ranked by relevance
+{GREEN}notes-since {CYAN}<DD.MM.YYYY>{RESET}                       - notes changed since a date, newest first
+{GREEN}notes-between {CYAN}<DD.MM.YYYY> <DD.MM.YYYY>{RESET}        - notes changed between two dates
 {GREEN}add-tags {CYAN}<name> <note_id> <tag1> [tag2 ...]{RESET}    - add tags to note
 {GREEN}remove-tags {CYAN}<name> <note_id> <tag1> [tag2 ...]{RESET} - remove tags from note
 {GREEN}clear-tags {CYAN}<name> <note_id>{RESET}                    - clear note tags
 {GREEN}search-tags {CYAN}<name> <tag1> [tag2 ...] [--any]{RESET}   - search notes by tags
-{GREEN}find-tags {CYAN}<tag1> [tag2 ...] [--any]{RESET}            - global search by tags
+{GREEN}find-tags {CYAN}<tag1> [tag2 ...] [--any] [--top N]{RESET}  - global search by tags
+{GREEN}import {CYAN}<file.csv|file.jsonl>{RESET}                   - import contacts (JSONL also carries notes)
+{GREEN}export {CYAN}<file.csv|file.jsonl>{RESET}                   - export contacts (JSONL also carries notes)
+{GREEN}save-stats{RESET}                                     - show autosave timings
+{GREEN}stats{RESET}                                          - show command latency stats (with --stats)
 {GREEN}close{RESET} / {GREEN}exit{RESET}                                   - Save and exit
-    """)
-
-    commands = {
-        "add": add_contact,
-        "add-address": add_address,
-        "add-email": add_email,
-        "change": change_contact,
-        "delete": delete_contact,
-        "all": show_all,
-        "add-birthday": add_birthday,
-        "show-birthday": show_birthday,
-        "birthdays": upcoming_birthdays,
-        "add-note": add_note_cmd,
-        "phone": show_phone,
-        "list-notes": list_notes_cmd,
-        "search-notes": search_notes_cmd,
-        "edit-note": edit_note_cmd,
-        "delete-note": delete_note_cmd,
-        "find-notes": find_notes_cmd,
-        "add-tags": add_tags_cmd,
-        "remove-tags": remove_tags_cmd,
-        "clear-tags": clear_tags_cmd,
-        "search-tags": search_tags_cmd,
-        "find-tags": find_tags_cmd,
-    }
+"""
 
-    all_commands = list(commands.keys()) + ["hello", "exit", "close"]
+BANNER = (
+    "\n👋 Welcome to the assistant bot!\n"
+    + rf"""
+ /$$$$$$$$                  /$$              /$$$$$$$$                               
+|__  $$__/                 | $$             |__  $$__/                               
+   | $$ /$$   /$$  /$$$$$$ | $$$$$$$   /$$$$$$ | $$  /$$$$$$   /$$$$$$  /$$$$$$/$$$$ 
+   | $$| $$  | $$ /$$__  $$| $$__  $$ /$$__  $$| $$ /$$__  $$ /$$__  $$| $$_  $$_  $$
+   | $$| $$  | $$| $$  \ _/| $$  \ $$| $$  \ $$| $$| $$$$$$$$| $$$$$$$$| $$ \ $$ \ $$
+   | $$| $$  | $$| $$      | $$  | $$| $$  | $$| $$| $$_____/| $$_____/| $$ | $$ | $$
+   | $$|  $$$$$$/| $$      | $$$$$$$/|  $$$$$$/| $$|  $$$$$$$|  $$$$$$$| $$ | $$ | $$
+   |__/ \ _____/ |__/      |_______/  \ _____/ |__/ \ ______/ \ ______/|__/ |__/ |__/                                                                                                                                                                                
 
-    def guess_commands(cmd, options):
-        opts = list(options)
-        fuzzy = get_close_matches(cmd, opts, n=5, cutoff=0.5)
-        prefix = [o for o in opts if o.startswith(cmd)]
-        infix = [o for o in opts if cmd in o]
-        combined = []
-        seen = set()
-        for o in fuzzy + prefix + infix:
-            if o not in seen:
-                seen.add(o)
-                combined.append(o)
-        return combined[:5]
-
-    command_completer = WordCompleter(
-        list(commands.keys()) + ["hello", "exit", "close"], ignore_case=True
+{GREEN_BG} Available commands! Please use one of the following: {RESET}
+
+"""
+    + COMMANDS_HELP
+)
+
+INVALID_COMMAND_HELP = f"\n{RED_BG}Invalid command. Available commands:{RESET}\n" + COMMANDS_HELP
+
+
+def import_times(limit=STARTUP_IMPORTS_SHOWN) -> list[tuple[str, int]]:
+    # Imports finish before main() can time them, so a fresh interpreter
+    # imports this module under -X importtime and reports them per module.
+    import subprocess
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
     )
+    children = []
+    for line in result.stderr.splitlines():
+        try:
+            _, cumulative, name = line.split("|")
+            cumulative = int(cumulative)
+        except ValueError:
+            continue
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        if depth == 0:
+            if name.strip() == "main":
+                return sorted(children, key=lambda item: -item[1])[:limit]
+            children = []
+        elif depth == 1:
+            children.append((name.strip(), cumulative))
+    return []
+
+
+class StartupProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.steps = []
+
+    def add(self, label, seconds):
+        self.steps.append((label, seconds))
+
+    @contextmanager
+    def step(self, label):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(label, time.perf_counter() - started)
+
+    def timed(self, label, func, *args):
+        with self.step(label):
+            return func(*args)
+
+    def report(self, pending=None):
+        elapsed = time.perf_counter() - self.started
+        lines = [f"\n{LIGHT_GRAY_BG}Startup profile:{RESET_BG}"]
+        for label, seconds in list(self.steps):
+            lines.append(f"{label:<32} {seconds * 1000:>9.1f} ms")
+        if pending is not None and not pending.done():
+            lines.append(f"{'book load (background)':<32} {'still running':>12}")
+        lines.append(f"{'first prompt after main()':<32} {elapsed * 1000:>9.1f} ms")
+        lines.append(f"{LIGHT_GRAY_BG}Slowest imports (python -X importtime):{RESET_BG}")
+        for name, micros in import_times():
+            lines.append(f"{name:<32} {micros / 1000:>9.1f} ms")
+        return "\n".join(lines)
+
+
+def main():
+    profile = StartupProfile()
+    parser = argparse.ArgumentParser(description="TurboTeem assistant bot")
+    parser.add_argument(
+        "--data",
+        default="addressbook.pkl",
+        help="address book file; use a .db/.sqlite file for the SQLite storage",
+    )
+    parser.add_argument(
+        "--batch",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="run commands from FILE (or stdin) without the interactive prompt",
+    )
+    parser.add_argument(
+        "--save-every",
+        type=int,
+        default=0,
+        metavar="N",
+        help="in batch mode, also save after every N commands",
+    )
+    parser.add_argument(
+        "--autosave-every",
+        type=int,
+        default=AUTOSAVE_EVERY,
+        metavar="N",
+        help="autosave in the background after N changes (0 turns it off)",
+    )
+    parser.add_argument(
+        "--autosave-interval",
+        type=float,
+        default=AUTOSAVE_INTERVAL,
+        metavar="SECONDS",
+        help="autosave unsaved changes at least this often (0 turns it off)",
+    )
+    parser.add_argument(
+        "--stats",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="collect per-command latency stats; print them on exit or write JSON to FILE",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="ADDRESS",
+        help="serve the commands over a line protocol on HOST:PORT or unix:PATH",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=0,
+        metavar="N",
+        help="run find-notes/find-tags over N book shards in worker processes",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print how long each startup step and the slowest imports took",
+    )
+    options = parser.parse_args()
+    profile.add("interpreter, imports, args (CPU)", time.process_time())
+
+    if options.stats is not None:
+        enable_command_stats()
+    if options.serve or options.batch is not None:
+        book = load_data(options.data)
+        book.shard_count = options.shards
+    if options.serve:
+        import asyncio
+
+        saver = None
+        if options.autosave_every or options.autosave_interval:
+            saver = AutoSaver(
+                book, options.data, options.autosave_every, options.autosave_interval
+            )
+        try:
+            asyncio.run(BotServer(book, options.data, saver).serve(options.serve))
+        except KeyboardInterrupt:
+            pass
+        save_data(book, options.data)
+        dump_command_stats(options.stats)
+        print("✅ Server stopped. Data saved.\n")
+        return
+    if options.batch == "-":
+        run_batch(book, sys.stdin, options.data, options.save_every)
+        dump_command_stats(options.stats)
+        return
+    elif options.batch is not None:
+        with open(options.batch, encoding="utf-8") as f:
+            run_batch(book, f, options.data, options.save_every)
+        dump_command_stats(options.stats)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    loader = ThreadPoolExecutor(max_workers=1)
+    book_future = loader.submit(profile.timed, "book load (background)", load_data, options.data)
+    loader.shutdown(wait=False)
+    print(BANNER)
+    with profile.step("prompt_toolkit import"):
+        read_command = load_prompt(commands)
+
+    if options.profile_startup:
+        print(profile.report(book_future))
+
+    book = None
+    saver = None
+
+    def ready_book():
+        nonlocal book, saver
+        if book is None:
+            with profile.step("waiting for the book"):
+                book = book_future.result()
+            book.shard_count = options.shards
+            if options.autosave_every or options.autosave_interval:
+                saver = AutoSaver(
+                    book, options.data, options.autosave_every, options.autosave_interval
+                ).start()
+        return book
 
     while True:
         try:
-            user_input = pt_prompt("Enter a command:  ", completer=command_completer)
+            user_input = read_command("Enter a command:  ")
         except (KeyboardInterrupt, EOFError):
-            save_data(book)
+            ready_book()
+            if saver is not None:
+                saver.stop()
+            save_data(book, options.data)
+            dump_command_stats(options.stats)
             print("✅ Good bye! Data saved.\n")
             break
 
@@ -1151,52 +3731,30 @@ def main():
         command = command.lower()
 
         if command in ["exit", "close"]:
-            save_data(book)
+            ready_book()
+            if saver is not None:
+                saver.stop()
+            save_data(book, options.data)
+            dump_command_stats(options.stats)
             print("✅ Work completed. Data saved. Bye!\n")
             break
         elif command == "hello":
             print("How can I help you?")
             continue
         elif command in commands:
-            if command == "all":
-                print(commands[command](book))
-            elif command == "birthdays":
+            ready_book()
+            with saver.lock if saver is not None else nullcontext():
+                result = commands[command](args, book)
+            if command == "birthdays":
                 print()
-                print(commands[command](book))
-            else:
-                print(commands[command](args, book))
+            print(result)
             continue
 
-        suggestions = guess_commands(command, all_commands)
+        suggestions = commands.suggest(command)
         if suggestions:
             print(f"Did you mean: {', '.join(suggestions)}?")
         else:
-            print(rf"""
-{RED_BG}Invalid command. Available commands:{RESET}
-{GREEN}hello{RESET}                                          - greet the assistant
-{GREEN}add {CYAN}<name> <phone>{RESET}                             - add a contact or phone
-{GREEN}change {CYAN}<name> <old_num> <new_num>{RESET}              - change a contact's phone
-{GREEN}phone {CYAN}<name>{RESET}                                   - show phones of a contact
-{GREEN}add-email {CYAN}<name> <email>{RESET}                       - add an email to contact
-{GREEN}all{RESET}                                            - show all contacts
-{GREEN}add-birthday {CYAN}<name> <DD.MM.YYYY]{RESET}               - add a birthday to a contact
-{GREEN}show-birthday {CYAN}<name>{RESET}                           - show the birthday of a contact
-{GREEN}birthdays{RESET}                                      - show upcoming birthdays in the next week
-{GREEN}add-note {CYAN}<name> <text> [tags: <t1,t2,...>]{RESET}     - add note
-{GREEN}list-notes {CYAN}<name> [--sort tags]{RESET}                - list contact notes
-{GREEN}search-notes {CYAN}<name> <query>{RESET}                    - search contact notes
-{GREEN}edit-note {CYAN}<name> <note_id> <new text>{RESET}          - edit note
-{GREEN}delete-note {CYAN}<name> <note_id>{RESET}                   - delete note
-{GREEN}find-notes {CYAN}<query>{RESET}                             - global notes search
-{GREEN}add-tags {CYAN}<name> <note_id> <tag1> [tag2 ...]{RESET}    - add tags to note
-{GREEN}remove-tags {CYAN}<name> <note_id> <tag1> [tag2 ...]{RESET} - remove tags from note
-{GREEN}clear-tags {CYAN}<name> <note_id>{RESET}                    - clear note tags
-{GREEN}search-tags {CYAN}<name> <tag1> [tag2 ...] [--any]{RESET}   - search notes by tags
-{GREEN}find-tags {CYAN}<tag1> [tag2 ...] [--any]{RESET}            - global search by tags
-{GREEN}close{RESET} / {GREEN}exit{RESET}                                   - Save and exit
-"""
-)
-
+            print(INVALID_COMMAND_HELP)
 
 if __name__ == "__main__":
     main()
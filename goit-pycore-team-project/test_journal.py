@@ -0,0 +1,50 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import main as bot
+
+
+class TornJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "book.pkl")
+        # The second load compacts Ann into a current snapshot, so later
+        # loads replay the journal instead of compacting it away.
+        self.write_book("Ann")
+        self.write_book("Bob")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write_book(self, *names):
+        book = bot.load_data(self.path)
+        for name in names:
+            bot.add_contact([name, "0501234567"], book)
+        book.storage.close()
+
+    def tear(self, path):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"op": "record", "name": "Bo')
+
+    def test_entries_after_torn_tail_survive_reload(self):
+        self.tear(self.path + ".journal")
+        self.write_book("Dan")
+
+        book = bot.load_data(self.path)
+        self.assertEqual(sorted(book.data), ["Ann", "Bob", "Dan"])
+        book.storage.close()
+
+    def test_torn_rotated_journal_is_replayed(self):
+        os.replace(self.path + ".journal", self.path + ".journal.1")
+        self.tear(self.path + ".journal.1")
+        self.write_book("Dan")
+
+        book = bot.load_data(self.path)
+        self.assertEqual(sorted(book.data), ["Ann", "Bob", "Dan"])
+        book.storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main()